@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_finished
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        if settings.TASK_QUEUE_EAGER:
+            from .tasks import schedule_periodic_tasks_eagerly
+            request_finished.connect(
+                schedule_periodic_tasks_eagerly,
+                dispatch_uid='schedule_periodic_tasks_eagerly'
+            )
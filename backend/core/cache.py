@@ -0,0 +1,119 @@
+"""Кэширование ответов API на чтение."""
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+VERSION_KEY = 'api-cache:version:{}'
+STATS_KEY = 'api-cache:stats:{}'
+CACHE_EVENTS = ('hits', 'misses')
+RESPONSE_KEY = 'api-cache:response:{}:{}:{}'
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_cache_version(group):
+    """
+    Возвращает текущую версию группы кэша. Начальное значение берётся
+    из времени, чтобы после вытеснения ключа версии старые записи
+    не стали снова доступны.
+    """
+    return cache.get_or_set(VERSION_KEY.format(group), time.time_ns(), None)
+
+
+def bump_cache_version(*groups):
+    """Делает недействительными все закэшированные ответы групп."""
+    for group in groups:
+        key = VERSION_KEY.format(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def count_cache_event(event):
+    """Увеличивает счётчик попаданий или промахов одним обращением к кэшу."""
+    key = STATS_KEY.format(event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_cache_stats():
+    return {
+        event: cache.get(STATS_KEY.format(event), 0)
+        for event in CACHE_EVENTS
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([STATS_KEY.format(event) for event in CACHE_EVENTS])
+
+
+def get_response_cache_key(group, version, request):
+    """Ключ ответа: версия группы, хост и полный путь с параметрами."""
+    url = f'{request.get_host()}{request.get_full_path()}'
+    return RESPONSE_KEY.format(group, version, md5(url.encode()).hexdigest())
+
+
+def get_cached_headers(response):
+    """Заголовки ответа, которые хранятся в кэше вместе с данными."""
+    return {
+        header: response[header]
+        for header in CACHED_HEADERS
+        if response.has_header(header)
+    }
+
+
+class CachedResponseMixin:
+    """
+    Кэширует сериализованные ответы list и retrieve вместе с заголовками
+    CACHED_HEADERS. Ключ включает версию группы cache_group, хост и полный
+    путь с параметрами запроса. Ответы для аутентифицированных пользователей
+    кэшируются, только если cache_authenticated = True (ответ не зависит
+    от пользователя). Без общего кэша (API_CACHE_ENABLED = False) ответы
+    не кэшируются, а счётчики попаданий и промахов не ведутся.
+    """
+    cache_group = None
+    cache_authenticated = False
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED or (
+            request.user.is_authenticated and not self.cache_authenticated
+        ):
+            return handler(request, *args, **kwargs)
+        key = get_response_cache_key(
+            self.cache_group,
+            get_cache_version(self.cache_group),
+            request
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            count_cache_event('hits')
+            data, headers = cached
+            response = Response(data, headers=headers)
+            response['X-Cache'] = 'HIT'
+            return response
+        count_cache_event('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                (response.data, get_cached_headers(response)),
+                settings.API_CACHE_TIMEOUT
+            )
+        response['X-Cache'] = 'MISS'
+        return response
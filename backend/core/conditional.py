@@ -0,0 +1,179 @@
+"""
+Условные GET-запросы (If-None-Match, If-Modified-Since).
+
+Валидаторы ответа (ETag и Last-Modified) строятся из версий коллекций
+CollectionVersion и из данных, которые вьюсет уже загрузил, поэтому
+ответ 304 отдаётся без сериализации.
+"""
+from calendar import timegm
+from hashlib import md5
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.utils.http import http_date, parse_http_date_safe
+
+from .models import CollectionVersion
+
+
+def bump_collection_version(*names):
+    """Увеличивает версии коллекций в текущей транзакции."""
+    now = timezone.now()
+    for name in names:
+        if not CollectionVersion.objects.filter(name=name).update(
+            version=F('version') + 1,
+            updated_at=now
+        ):
+            CollectionVersion.objects.get_or_create(
+                name=name,
+                defaults={'version': 1, 'updated_at': now}
+            )
+
+
+def get_collection_versions(*names):
+    """
+    Возвращает {коллекция: (версия, время изменения)} одним запросом.
+    Коллекция, которая ещё ни разу не менялась, имеет версию 0 и время None.
+    """
+    versions = dict.fromkeys(names, (0, None))
+    versions.update(
+        (name, (version, updated_at))
+        for name, version, updated_at in CollectionVersion.objects.filter(
+            name__in=names
+        ).values_list('name', 'version', 'updated_at')
+    )
+    return versions
+
+
+def make_etag(*parts):
+    """Слабый ETag из значений, от которых зависит ответ."""
+    return 'W/"{}"'.format(md5(repr(parts).encode()).hexdigest())
+
+
+def get_timestamp(*moments):
+    """Самый поздний из моментов времени для Last-Modified или None."""
+    moments = [moment for moment in moments if moment is not None]
+    return timegm(max(moments).utctimetuple()) if moments else None
+
+
+def has_conditional_headers(request):
+    return (
+        'If-None-Match' in request.headers
+        or 'If-Modified-Since' in request.headers
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def apply_validators(request, response, user_dependent=False):
+    """Помечает ответ с ETag no-cache и отвечает 304 актуальному клиенту."""
+    if not response.has_header('ETag'):
+        return response
+    if user_dependent:
+        patch_vary_headers(response, ('Authorization', ))
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+    patch_cache_control(response, no_cache=True)
+    if request.method != 'GET' or response.status_code != 200:
+        return response
+    return get_conditional_response(
+        request,
+        etag=response['ETag'],
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response
+    )
+
+
+class ConditionalGetMixin:
+    """Условные GET для list и retrieve без лишней сериализации."""
+    conditional_objects = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_validators(self, objects=None):
+        """ETag и Last-Modified по версии коллекции cache_group."""
+        version, updated_at = get_collection_versions(
+            self.cache_group
+        )[self.cache_group]
+        return (
+            make_etag(
+                self.cache_group,
+                version,
+                self.request.get_full_path(),
+                self.request.accepted_media_type
+            ),
+            get_timestamp(updated_at)
+        )
+
+    def prepare_conditional_objects(self, objects):
+        """Догружает данные, нужные для сериализации объектов ответа."""
+        return objects
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        validators = None
+        if has_conditional_headers(request):
+            validators = self.get_conditional_validators()
+            etag, last_modified = validators
+            if etag:
+                response = get_conditional_response(
+                    request,
+                    etag=etag,
+                    last_modified=last_modified
+                )
+                if response is not None:
+                    return set_validators(response, etag, last_modified)
+            if self.conditional_objects is not None:
+                self.conditional_objects = self.prepare_conditional_objects(
+                    self.conditional_objects
+                )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(
+                response,
+                *(
+                    validators
+                    or self.get_conditional_validators(
+                        self.conditional_objects
+                    )
+                )
+            )
+        return response
+
+    def paginate_queryset(self, queryset):
+        if self.conditional_objects is None:
+            self.conditional_objects = super().paginate_queryset(queryset)
+        return self.conditional_objects
+
+    def get_object(self):
+        if self.conditional_objects is None:
+            self.conditional_objects = [super().get_object()]
+            return self.conditional_objects[0]
+        obj = self.conditional_objects[0]
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Ответ из кэша тоже сверяется с версией клиента."""
+        return apply_validators(
+            request,
+            super().finalize_response(request, response, *args, **kwargs),
+            not getattr(self, 'cache_authenticated', False)
+        )
@@ -0,0 +1,44 @@
+"""Денормализованные счётчики связанных объектов."""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def increment_counter(model, pk, field, delta=1):
+    """
+    Атомарно изменяет счётчик на delta выражением F(), без чтения строки.
+    Счётчик не опускается ниже нуля, даже если успел разойтись с данными.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def get_actual_count(related_model, related_field):
+    """Подзапрос с фактическим числом связанных объектов."""
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(
+                **{related_field: OuterRef('pk')}
+            ).order_by().values(related_field).annotate(
+                total=Count('pk')
+            ).values('total')
+        ),
+        0
+    )
+
+
+def recalculate_counter(model, field, related_model, related_field,
+                        dry_run=False):
+    """
+    Сверяет счётчик со связанными объектами и исправляет расхождения.
+    Возвращает число строк, в которых счётчик разошёлся с данными.
+    """
+    actual = get_actual_count(related_model, related_field)
+    drifted = model.objects.annotate(actual=actual).exclude(
+        **{field: F('actual')}
+    ).values('pk')
+    count = drifted.count()
+    if count and not dry_run:
+        model.objects.filter(pk__in=drifted).update(**{field: actual})
+    return count
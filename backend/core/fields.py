@@ -1,15 +1,126 @@
 import base64
+import binascii
+import re
+from tempfile import SpooledTemporaryFile
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+from foodgram.constants import BASE64_CHUNK_SIZE
+
+NON_BASE64_CHARS = re.compile('[^A-Za-z0-9+/=]')
+
+
+def decode_base64_to_file(data, name, content_type):
+    """
+    Декодирует base64 по частям во временный файл. Небольшие изображения
+    остаются в памяти, крупные сбрасываются на диск, не создавая в памяти
+    полную копию декодированных данных. Переводы строк и другие символы
+    вне алфавита base64 отбрасываются, как и в base64.b64decode, а
+    неполная группа из четырёх символов переносится в следующую часть.
+    """
+    file = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    remainder = ''
+    try:
+        for start in range(0, len(data), BASE64_CHUNK_SIZE):
+            chunk = remainder + NON_BASE64_CHARS.sub(
+                '', data[start:start + BASE64_CHUNK_SIZE]
+            )
+            end = len(chunk) - len(chunk) % 4
+            file.write(base64.b64decode(chunk[:end]))
+            remainder = chunk[end:]
+        if remainder:
+            file.write(base64.b64decode(remainder))
+    except binascii.Error:
+        file.close()
+        raise
+    size = file.tell()
+    file.seek(0)
+    return UploadedFile(file, name, content_type, size)
 
 
 class Base64ImageField(serializers.ImageField):
     """Кастомное поле сериализатора для работы с изображениями."""
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            try:
+                format, imgstr = data.split(';base64,')
+                ext = format.split('/')[-1]
+                data = decode_base64_to_file(
+                    imgstr,
+                    'temp.' + ext,
+                    format[len('data:'):]
+                )
+            except (ValueError, binascii.Error):
+                self.fail('invalid_image')
+
+        return super().to_internal_value(data)
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список первичных ключей, объекты по которым загружаются одним
+    запросом pk__in, а не запросом на каждый ключ. В ошибке перечисляются
+    сразу все несуществующие ключи.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Объекты с ключами {pk_values} не существуют.',
+    }
 
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_values = []
+        for item in data:
+            if child.pk_field is not None:
+                item = child.pk_field.to_internal_value(item)
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pk_values.append(queryset.model._meta.pk.to_python(item))
+            except (TypeError, ValueError, ValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+        objects = queryset.in_bulk(set(pk_values))
+        missing = dict.fromkeys(
+            pk for pk in pk_values if pk not in objects
+        )
+        if missing:
+            self.fail(
+                'does_not_exist',
+                pk_values=', '.join(map(str, missing))
+            )
+        return [objects[pk] for pk in pk_values]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """При many=True проверяет все ключи одним запросом."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+class LoadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Кроме первичного ключа принимает уже загруженный объект модели и
+    не запрашивает его повторно. Объект может передать только код
+    представления: из JSON приходят лишь простые значения.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, self.get_queryset().model):
+            return data
         return super().to_internal_value(data)
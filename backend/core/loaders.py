@@ -0,0 +1,37 @@
+"""Данные в памяти процесса с ограниченным временем жизни."""
+import threading
+import time
+
+
+class TTLCachedLoader:
+    """
+    Загружает данные функцией load при первом обращении и перезагружает
+    их по истечении ttl секунд или после invalidate.
+    """
+
+    def __init__(self, load, ttl):
+        self.load = load
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._state = None
+
+    def invalidate(self):
+        self._state = None
+
+    def peek(self):
+        """Уже загруженные данные или None; загрузку не запускает."""
+        state = self._state
+        return None if state is None else state[1]
+
+    def get(self):
+        state = self._state
+        if self._is_stale(state):
+            with self.lock:
+                state = self._state
+                if self._is_stale(state):
+                    state = time.monotonic() + self.ttl, self.load()
+                    self._state = state
+        return state[1]
+
+    def _is_stale(self, state):
+        return state is None or time.monotonic() >= state[0]
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hit/miss counters of the API response cache. Counters are '
+        'kept only when the cache is enabled, i.e. with a shared backend '
+        'such as Redis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.API_CACHE_ENABLED:
+            self.stdout.write(
+                'API response cache is disabled: set REDIS_URL to enable it.'
+            )
+            return
+        stats = get_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total * 100 if total else 0
+        self.stdout.write(
+            f'hits: {stats["hits"]}, misses: {stats["misses"]}, '
+            f'hit ratio: {ratio:.1f}%'
+        )
+        if options['reset']:
+            reset_cache_stats()
@@ -0,0 +1,219 @@
+"""
+Проверка покрытия индексами.
+
+Выполняет GET /api/recipes/ для всех сочетаний фильтров и сортировок,
+снимает EXPLAIN (ANALYZE) каждого SQL-запроса с условием WHERE и сообщает
+о последовательных сканированиях таблиц больше --min-rows строк, кроме
+сканирований с условием, под которое подходит большая часть строк.
+Запросы без условий (например, COUNT(*) всех рецептов) читают таблицу
+целиком по смыслу и не проверяются, как и справочники REFERENCE_TABLES.
+С --seed команда создаёт и заполняет отдельную базу так же, как
+benchmark_api, поэтому её можно запускать в CI с пустым PostgreSQL.
+"""
+import json
+from itertools import combinations, product
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from rest_framework.test import APIClient
+
+from foodgram.constants import CURSOR_QUERY_PARAM
+from recipes.filters import RECIPE_ORDERINGS
+from recipes.models import Recipe, Tag
+from .benchmark_api import Command as BenchmarkCommand
+
+User = get_user_model()
+
+FILTERS = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart', 'name')
+DEFAULT_MIN_ROWS = 1000
+REFERENCE_TABLES = ('recipes_ingredient', 'recipes_tag')
+
+
+def find_seq_scans(plan):
+    """
+    Узлы Seq Scan плана: (таблица, условие фильтрации или '').
+    Сканирование с условием, которое оставляет большую часть строк,
+    дешевле индекса и не считается проблемой.
+    """
+    scans = []
+    if plan['Node Type'] == 'Seq Scan' and (
+        'Filter' not in plan
+        or plan['Rows Removed by Filter'] > plan['Actual Rows']
+    ):
+        scans.append((plan['Relation Name'], plan.get('Filter', '')))
+    for child in plan.get('Plans', ()):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN (ANALYZE) for the SQL of /api/recipes/ under every '
+        'combination of filters and orderings and report sequential scans. '
+        'Needs PostgreSQL; fails when a scan is found.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help='Audit a throwaway database seeded like benchmark_api.'
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=DEFAULT_MIN_ROWS,
+            help='Ignore scans of tables with fewer estimated rows.'
+        )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            choices=FILTERS,
+            help='Filter to combine; repeat to pick several (default: all).'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print every checked query, not only the offending ones.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Команда работает только с PostgreSQL')
+        if not options['seed']:
+            return self.audit(options)
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0,
+            serialize=False
+        )
+        try:
+            self.stdout.write('Заполнение базы...')
+            benchmark = BenchmarkCommand()
+            benchmark._seed(vars(
+                benchmark.create_parser('manage.py', 'benchmark_api')
+                .parse_args([])
+            ))
+            self.audit(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def audit(self, options):
+        self.params = self.get_filter_values()
+        self.table_rows = self.get_table_rows()
+        self.min_rows = options['min_rows']
+        client = APIClient()
+        client.force_authenticate(self.params.pop('user'))
+        filters = options['filter'] or FILTERS
+        checked = set()
+        problems = 0
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for query in self.get_queries(filters):
+                url = f'/api/recipes/?{urlencode(query, doseq=True)}'
+                with CaptureQueriesContext(connection) as context:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'{url}: {response.status_code}')
+                for captured in context.captured_queries:
+                    sql = captured['sql']
+                    if (
+                        not sql.startswith('SELECT')
+                        or ' WHERE ' not in sql
+                        or sql in checked
+                    ):
+                        continue
+                    checked.add(sql)
+                    scans = self.explain(sql)
+                    if scans or options['verbose_plans']:
+                        self.stdout.write(f'{url}\n  {sql[:300]}')
+                    for table, condition in scans:
+                        problems += 1
+                        self.stdout.write(self.style.WARNING(
+                            f'  Seq Scan {table} '
+                            f'(~{self.table_rows[table]:.0f} строк): '
+                            f'{condition}'
+                        ))
+        self.stdout.write(
+            f'Проверено запросов: {len(checked)}, '
+            f'последовательных сканирований: {problems}'
+        )
+        if problems:
+            raise CommandError('Найдены запросы без подходящего индекса')
+
+    def get_filter_values(self):
+        """Значения фильтров, для которых в базе есть данные."""
+        user = User.objects.annotate(
+            favorites=Count('favorite_user')
+        ).order_by('-favorites').first()
+        recipe = Recipe.objects.order_by('-id').first()
+        if user is None or recipe is None:
+            raise CommandError('База пуста: заполните её тестовыми данными')
+        return {
+            'user': user,
+            'tags': list(Tag.objects.values_list('slug', flat=True)[:2]),
+            'author': recipe.author_id,
+            'is_favorited': 1,
+            'is_in_shopping_cart': 1,
+            'name': recipe.name[:3],
+        }
+
+    def get_table_rows(self):
+        """
+        Обновляет статистику планировщика (в только что заполненной базе
+        её ещё нет) и возвращает оценку числа строк таблиц.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"
+            )
+            return dict(cursor.fetchall())
+
+    def get_queries(self, filters):
+        """
+        Все сочетания фильтров со всеми сортировками; теги - по одному
+        и по нескольку. Для сочетаний без фильтров - и курсорная
+        пагинация.
+        """
+        orderings = (None, *RECIPE_ORDERINGS)
+        for size in range(len(filters) + 1):
+            for names, ordering in product(
+                combinations(filters, size),
+                orderings
+            ):
+                tag_variants = (
+                    (self.params['tags'][:1], self.params['tags'])
+                    if 'tags' in names else (None, )
+                )
+                for tags in tag_variants:
+                    query = {name: self.params[name] for name in names}
+                    if tags is not None:
+                        query['tags'] = tags
+                    if ordering:
+                        query['ordering'] = ordering
+                    yield query
+                    if not names:
+                        yield {**query, CURSOR_QUERY_PARAM: ''}
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return [
+            (table, condition)
+            for table, condition in find_seq_scans(plan[0]['Plan'])
+            if table not in REFERENCE_TABLES
+            and self.table_rows.get(table, 0) >= self.min_rows
+        ]
@@ -0,0 +1,507 @@
+"""
+Нагрузочный бенчмарк API.
+
+Создаёт отдельную тестовую базу, наполняет её синтетическими данными
+и для каждого маршрута из foodgram/urls.py измеряет число SQL-запросов,
+задержку (p50/p95) и пиковое потребление памяти. Изменяющие запросы
+из WRITE_ROUTES выполняются по одному разу и проверяются только по
+числу запросов. Если хотя бы один маршрут выходит за бюджет, команда
+завершается с ошибкой.
+"""
+import base64
+import random
+import statistics
+import time
+import tracemalloc
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from short_url import encode_url
+
+from recipes.catalogue import get_catalogue_version
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from recipes.shopping_list import refresh_shopping_lists
+from recipes.trending import update_trending_scores
+from users.models import Subscriptions
+
+User = get_user_model()
+
+SEED = 42
+BATCH_SIZE = 1000
+TAGS = (
+    ('Завтрак', 'breakfast'),
+    ('Обед', 'lunch'),
+    ('Ужин', 'dinner'),
+    ('Десерт', 'dessert'),
+    ('Выпечка', 'bakery'),
+)
+# Отдельный кэш, чтобы не смешивать замеры с данными рабочего кэша.
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+BENCH_FOLLOWING = 50
+BENCH_FAVORITES = 30
+BENCH_CART = 100
+MAX_RECIPE_INGREDIENTS = 12
+
+# Маршрут: (название, адрес, нужна ли авторизация, бюджет SQL-запросов).
+# Адреса могут ссылаться на {recipe_id}, {short_code} и {catalogue_version}.
+# Версии коллекций для ETag и снимка справочника читаются из БД
+# отдельным запросом.
+ROUTES = (
+    ('recipes-list', '/api/recipes/', False, 5),
+    ('recipes-list-auth', '/api/recipes/?limit=24', True, 7),
+    (
+        'recipes-filter',
+        '/api/recipes/?tags=breakfast&tags=dinner&is_favorited=1',
+        True,
+        8
+    ),
+    (
+        'recipes-trending',
+        '/api/recipes/?ordering=trending&cursor=',
+        False,
+        4
+    ),
+    ('recipes-detail', '/api/recipes/{recipe_id}/', True, 6),
+    ('recipes-feed', '/api/recipes/feed/', True, 6),
+    ('users-list', '/api/users/', True, 4),
+    ('users-me', '/api/users/me/', True, 1),
+    (
+        'subscriptions',
+        '/api/users/subscriptions/?recipes_limit=3',
+        True,
+        5
+    ),
+    (
+        'download-shopping-cart',
+        '/api/recipes/download_shopping_cart/',
+        True,
+        4
+    ),
+    ('ingredients-search', '/api/ingredients/?name=мол', False, 2),
+    ('ingredients-list', '/api/ingredients/', False, 2),
+    ('tags-list', '/api/tags/', False, 2),
+    ('catalogue', '/api/catalogue/', False, 1),
+    (
+        'catalogue-snapshot',
+        '/api/catalogue/{catalogue_version}/',
+        False,
+        1
+    ),
+    ('get-short-link', '/api/recipes/{recipe_id}/get-link/', True, 1),
+    ('short-link-redirect', '/s/{short_code}/', False, 1),
+)
+# Изменяющий маршрут: (название, метод, адрес, тело запроса из контекста
+# или None, бюджет SQL-запросов). Все выполняются от имени benchmark.
+WRITE_ROUTES = (
+    ('recipe-create', 'post', '/api/recipes/', 'new_recipe', 13),
+    (
+        'recipe-update',
+        'patch',
+        '/api/recipes/{own_recipe_id}/',
+        'recipe_changes',
+        20
+    ),
+    ('favorite', 'post', '/api/recipes/{other_recipe_id}/favorite/', None, 5),
+    (
+        'shopping-cart',
+        'post',
+        '/api/recipes/{other_recipe_id}/shopping_cart/',
+        None,
+        11
+    ),
+    (
+        'subscribe',
+        'post',
+        '/api/users/{author_id}/subscribe/?recipes_limit=3',
+        None,
+        9
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database and measure query count, latency and '
+        'peak memory of every API route. Fails when a budget is exceeded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--subscriptions', type=int, default=10000)
+        parser.add_argument('--favorites', type=int, default=20000)
+        parser.add_argument('--carts', type=int, default=10000)
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of timed requests per route.'
+        )
+        parser.add_argument(
+            '--max-p95',
+            type=float,
+            default=250.0,
+            help='Latency budget for p95, milliseconds.'
+        )
+        parser.add_argument(
+            '--route',
+            action='append',
+            dest='routes',
+            help='Benchmark only the given route (may be repeated).'
+        )
+
+    @override_settings(CACHES=BENCH_CACHES)
+    def handle(self, *args, **options):
+        routes = [
+            route for route in ROUTES
+            if not options['routes'] or route[0] in options['routes']
+        ]
+        write_routes = [
+            route for route in WRITE_ROUTES
+            if not options['routes'] or route[0] in options['routes']
+        ]
+        if not routes and not write_routes:
+            raise CommandError('Не найдено ни одного маршрута для замера')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0,
+            serialize=False
+        )
+        try:
+            self.stdout.write('Заполнение базы...')
+            started = time.perf_counter()
+            context = self._seed(options)
+            self.stdout.write(
+                f'Готово за {time.perf_counter() - started:.1f} с'
+            )
+            failures = self._run(routes, context, options)
+            with TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    failures += self._run_writes(write_routes, context)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        if failures:
+            raise CommandError(
+                'Превышены бюджеты:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Все бюджеты соблюдены'))
+
+    def _seed(self, options):
+        rng = random.Random(SEED)
+        self._seed_ingredients()
+        tags = Tag.objects.bulk_create(
+            Tag(name=name, slug=slug) for name, slug in TAGS
+        )
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'user{i}',
+                    email=f'user{i}@example.com',
+                    first_name='Имя',
+                    last_name='Фамилия',
+                    password='!'
+                )
+                for i in range(options['users'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        user_ids = list(User.objects.values_list('id', flat=True))
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=rng.choice(user_ids),
+                    name=f'Рецепт {i}',
+                    text='Описание рецепта. ' * 20,
+                    cooking_time=rng.randint(1, 180),
+                    image='dish_picture/benchmark.png'
+                )
+                for i in range(options['recipes'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+        Recipe.tags.through.objects.bulk_create(
+            (
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.id)
+                for recipe_id in recipe_ids
+                for tag in rng.sample(tags, rng.randint(1, 3))
+            ),
+            batch_size=BATCH_SIZE
+        )
+        IngredientRecipe.objects.bulk_create(
+            (
+                IngredientRecipe(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=rng.randint(1, 500)
+                )
+                for recipe_id in recipe_ids
+                for ingredient_id in rng.sample(
+                    ingredient_ids,
+                    rng.randint(1, MAX_RECIPE_INGREDIENTS)
+                )
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+        bench_user = User.objects.create_user(
+            username='benchmark',
+            email='benchmark@example.com',
+            password='benchmark',
+            first_name='Бенчмарк',
+            last_name='Бенчмарк'
+        )
+        token = Token.objects.create(user=bench_user)
+        self._seed_pairs(
+            Subscriptions,
+            'author_id',
+            rng,
+            user_ids,
+            user_ids,
+            options['subscriptions'],
+            bench_user,
+            BENCH_FOLLOWING
+        )
+        self._seed_pairs(
+            Favorite,
+            'recipe_id',
+            rng,
+            user_ids,
+            recipe_ids,
+            options['favorites'],
+            bench_user,
+            BENCH_FAVORITES
+        )
+        self._seed_pairs(
+            ShoppingCart,
+            'recipe_id',
+            rng,
+            user_ids,
+            recipe_ids,
+            options['carts'],
+            bench_user,
+            BENCH_CART
+        )
+        refresh_shopping_lists(user_ids + [bench_user.id])
+        call_command('recalculate_counters', stdout=StringIO())
+        call_command('rebuild_feeds', stdout=StringIO())
+        update_trending_scores()
+        recipe_id = rng.choice(recipe_ids)
+        return {
+            'token': token.key,
+            'recipe_id': recipe_id,
+            'short_code': encode_url(recipe_id),
+            'catalogue_version': get_catalogue_version(),
+            **self._seed_write_targets(rng, bench_user, tags, ingredient_ids)
+        }
+
+    def _seed_write_targets(self, rng, bench_user, tags, ingredient_ids):
+        """
+        Данные для WRITE_ROUTES: свой рецепт benchmark для изменения,
+        чужой рецепт не в избранном и не в корзине, автор без подписки.
+        """
+        own_ingredients = rng.sample(ingredient_ids, MAX_RECIPE_INGREDIENTS)
+        own_recipe = Recipe.objects.create(
+            author=bench_user,
+            name='Свой рецепт',
+            text='Описание рецепта.',
+            cooking_time=30,
+            image='dish_picture/benchmark.png'
+        )
+        own_recipe.tags.set(tags[:2])
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=own_recipe,
+                ingredient_id=ingredient_id,
+                amount=100
+            )
+            for ingredient_id in own_ingredients
+        )
+        new_ingredient_id = next(
+            ingredient_id for ingredient_id in ingredient_ids
+            if ingredient_id not in own_ingredients
+        )
+        image = BytesIO()
+        Image.new('RGB', (64, 64), 'orange').save(image, 'PNG')
+        return {
+            'own_recipe_id': own_recipe.id,
+            'other_recipe_id': Recipe.objects.exclude(
+                author=bench_user
+            ).exclude(
+                favorite_recipe__user=bench_user
+            ).exclude(
+                shoppingcart_recipe__user=bench_user
+            ).values_list('id', flat=True).first(),
+            'author_id': User.objects.exclude(
+                followers__user=bench_user
+            ).exclude(
+                pk=bench_user.pk
+            ).values_list('id', flat=True).first(),
+            'new_recipe': {
+                'name': 'Новый рецепт',
+                'text': 'Описание рецепта.',
+                'cooking_time': 15,
+                'image': 'data:image/png;base64,'
+                + base64.b64encode(image.getvalue()).decode(),
+                'tags': [tag.id for tag in tags[:2]],
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': 50}
+                    for ingredient_id in own_ingredients
+                ],
+            },
+            'recipe_changes': {
+                'name': 'Свой рецепт, версия 2',
+                'text': 'Описание рецепта.',
+                'cooking_time': 30,
+                'tags': [tag.id for tag in tags[1:3]],
+                'ingredients': [
+                    {'id': own_ingredients[0], 'amount': 200},
+                    *(
+                        {'id': ingredient_id, 'amount': 100}
+                        for ingredient_id in own_ingredients[1:-1]
+                    ),
+                    {'id': new_ingredient_id, 'amount': 100},
+                ],
+            },
+        }
+
+    def _seed_ingredients(self):
+        call_command('load_csv', stdout=StringIO())
+
+    def _seed_pairs(self, model, target_field, rng, user_ids, target_ids,
+                    count, bench_user, bench_count):
+        """Создаёт случайные уникальные связи пользователь-объект."""
+        pairs = {
+            (bench_user.id, target_id)
+            for target_id in rng.sample(
+                target_ids,
+                min(bench_count, len(target_ids))
+            )
+        }
+        for _ in range(count):
+            pairs.add((rng.choice(user_ids), rng.choice(target_ids)))
+        model.objects.bulk_create(
+            (
+                model(**{'user_id': user_id, target_field: target_id})
+                for user_id, target_id in pairs
+                if user_id != target_id or target_field != 'author_id'
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+    def _run(self, routes, context, options):
+        anon = APIClient()
+        auth = APIClient()
+        auth.credentials(HTTP_AUTHORIZATION=f'Token {context["token"]}')
+        failures = []
+        self.stdout.write(
+            f'{"route":<24}{"status":>7}{"queries":>9}{"budget":>8}'
+            f'{"p50, ms":>10}{"p95, ms":>10}{"peak, KiB":>11}'
+        )
+        for name, url, needs_auth, query_budget in routes:
+            url = url.format(**context)
+            client = auth if needs_auth else anon
+            with CaptureQueriesContext(connection) as queries:
+                response = self._request(client, url)
+            query_count = len(queries)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                self._request(client, url)
+                timings.append((time.perf_counter() - started) * 1000)
+            tracemalloc.start()
+            self._request(client, url)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            p50 = statistics.median(timings)
+            p95 = self._percentile(timings, 95)
+            self.stdout.write(
+                f'{name:<24}{response.status_code:>7}'
+                f'{query_count:>9}{query_budget:>8}'
+                f'{p50:>10.1f}{p95:>10.1f}{peak / 1024:>11.0f}'
+            )
+            if response.status_code >= 400:
+                failures.append(f'{name}: статус {response.status_code}')
+            if query_count > query_budget:
+                failures.append(
+                    f'{name}: {query_count} запросов, бюджет {query_budget}'
+                )
+            if p95 > options['max_p95']:
+                failures.append(
+                    f'{name}: p95 {p95:.1f} мс, бюджет {options["max_p95"]}'
+                )
+        return failures
+
+    def _run_writes(self, routes, context):
+        """
+        Изменяющие запросы нельзя повторять, поэтому каждый выполняется
+        один раз и проверяется по статусу и числу SQL-запросов.
+        """
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {context["token"]}')
+        failures = []
+        for name, method, url, payload, query_budget in routes:
+            url = url.format(**context)
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(
+                    url,
+                    context[payload] if payload else None,
+                    format='json'
+                )
+            elapsed = (time.perf_counter() - started) * 1000
+            query_count = len(queries)
+            self.stdout.write(
+                f'{name:<24}{response.status_code:>7}'
+                f'{query_count:>9}{query_budget:>8}'
+                f'{elapsed:>10.1f}{"-":>10}{"-":>11}'
+            )
+            if response.status_code >= 400:
+                failures.append(f'{name}: статус {response.status_code}')
+            if query_count > query_budget:
+                failures.append(
+                    f'{name}: {query_count} запросов, бюджет {query_budget}'
+                )
+        return failures
+
+    @staticmethod
+    def _request(client, url):
+        response = client.get(url)
+        if getattr(response, 'streaming', False):
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    @staticmethod
+    def _percentile(values, percent):
+        ordered = sorted(values)
+        index = max(0, round(percent / 100 * len(ordered)) - 1)
+        return ordered[index]
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import Counter
+from statistics import quantiles
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?page=2',
+    '/api/tags/',
+    '/api/ingredients/?name=%D1%81%D0%BE',
+)
+DEFAULT_CONCURRENCY = 1000
+DEFAULT_DURATION = 30
+DEFAULT_WARMUP = 5
+REQUEST_TIMEOUT = 30
+
+
+async def read_response(reader):
+    """Читает ответ HTTP/1.1 и возвращает статус и признак keep-alive."""
+    status_line = await reader.readuntil(b'\r\n')
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readuntil(b'\r\n')) != b'\r\n':
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';')[0], 16)
+            if not size:
+                break
+            await reader.readexactly(size + 2)
+        await reader.readuntil(b'\r\n')
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') != 'close'
+
+
+class Target:
+    """Результаты нагрузки на один сервер."""
+
+    def __init__(self, name, url):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise CommandError(f'{url}: expected http://host[:port]')
+        self.name = name
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def build_request(self, path, token):
+        lines = [
+            f'GET {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+        ]
+        if token:
+            lines.append(f'Authorization: Token {token}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+    async def connection(self, requests, offset, deadline, record_from):
+        """
+        Отправляет запросы по одному keep-alive соединению, перебирая
+        пути по кругу начиная с offset.
+        """
+        writer = None
+        number = offset
+        while time.perf_counter() < deadline:
+            request = requests[number % len(requests)]
+            number += 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port),
+                        REQUEST_TIMEOUT
+                    )
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await asyncio.wait_for(
+                    read_response(reader),
+                    REQUEST_TIMEOUT
+                )
+            except (OSError, ValueError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError) as error:
+                if started >= record_from:
+                    self.errors[type(error).__name__] += 1
+                if writer is not None:
+                    writer.close()
+                writer = None
+                continue
+            if started >= record_from:
+                self.latencies.append(time.perf_counter() - started)
+                self.statuses[status] += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    async def run(self, paths, token, concurrency, duration, warmup):
+        requests = [self.build_request(path, token) for path in paths]
+        record_from = time.perf_counter() + warmup
+        deadline = record_from + duration
+        await asyncio.gather(*(
+            self.connection(requests, offset, deadline, record_from)
+            for offset in range(concurrency)
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Load running servers with concurrent keep-alive connections and '
+        'compare throughput and tail latency, e.g. two deployments: '
+        '--target before=http://127.0.0.1:8001 '
+        '--target after=http://127.0.0.1:8002'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            required=True,
+            help='NAME=URL of a server to benchmark; repeat to compare.'
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            help='Request path; repeat to mix several (default: hot reads).'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help='Number of open connections.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=DEFAULT_DURATION,
+            help='Seconds of measured load per target.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=float,
+            default=DEFAULT_WARMUP,
+            help='Seconds of unmeasured load before the measurement.'
+        )
+        parser.add_argument(
+            '--token',
+            help='Auth token to send with every request.'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive')
+        targets = []
+        for target in options['target']:
+            name, _, url = target.partition('=')
+            targets.append(Target(name, url))
+        paths = options['path'] or DEFAULT_PATHS
+        self.stdout.write(
+            f'{"target":10} {"requests":>9} {"req/s":>8} {"p50, ms":>9} '
+            f'{"p95, ms":>9} {"p99, ms":>9} {"max, ms":>9}  errors'
+        )
+        for target in targets:
+            asyncio.run(target.run(
+                paths,
+                options['token'],
+                options['concurrency'],
+                options['duration'],
+                options['warmup']
+            ))
+            self.report(target, options['duration'])
+
+    def report(self, target, duration):
+        latencies = [latency * 1000 for latency in target.latencies]
+        if len(latencies) > 1:
+            percentiles = quantiles(latencies, n=100)
+            p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0
+        failed = sum(target.errors.values()) + sum(
+            count for status, count in target.statuses.items()
+            if status >= 500
+        )
+        details = ', '.join(
+            f'{name}: {count}' for name, count in target.errors.items()
+        )
+        self.stdout.write(
+            f'{target.name:10} {len(latencies):9} '
+            f'{len(latencies) / duration:8.0f} {p50:9.1f} {p95:9.1f} '
+            f'{p99:9.1f} {max(latencies, default=0):9.1f}  '
+            f'{failed}{f" ({details})" if details else ""}'
+        )
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.counters import recalculate_counter
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscriptions
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Subscriptions, 'author'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare denormalized counters with the related rows and repair '
+        'the counters that have drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted counters.'
+        )
+
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in COUNTERS:
+            drifted = recalculate_counter(
+                model,
+                field,
+                related_model,
+                related_field,
+                options['dry_run']
+            )
+            self.stdout.write(
+                f'{model._meta.model_name}.{field}: '
+                f'расхождений {drifted}'
+            )
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
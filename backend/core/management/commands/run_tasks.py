@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import run_pending_tasks, schedule_periodic_tasks
+from foodgram.constants import (
+    PERIODIC_TASKS_CHECK_INTERVAL,
+    TASK_BATCH_SIZE,
+    TASK_POLL_INTERVAL
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the background task worker. Several workers can run at once: '
+        'on PostgreSQL each task is claimed by exactly one of them. '
+        'Tasks from settings.PERIODIC_TASKS are queued at their intervals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when there are no tasks ready to run.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TASK_BATCH_SIZE,
+            help='Number of tasks claimed at a time.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=TASK_POLL_INTERVAL,
+            help='Seconds to wait when the queue is empty.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        total = 0
+        next_periodic_check = 0
+        try:
+            while True:
+                if time.monotonic() >= next_periodic_check:
+                    schedule_periodic_tasks()
+                    next_periodic_check = (
+                        time.monotonic() + PERIODIC_TASKS_CHECK_INTERVAL
+                    )
+                claimed = run_pending_tasks(options['batch_size'])
+                total += claimed
+                if claimed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Tasks processed: {total}')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import get_queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the depth of the background task queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Put failed tasks back into the queue.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_queue_stats()
+        self.stdout.write(
+            f'ready: {stats["ready"]}, delayed: {stats["delayed"]}, '
+            f'running: {stats["running"]}, failed: {stats["failed"]}, '
+            f'oldest ready: {stats["oldest_age"]:.0f} s'
+        )
+        if options['retry_failed']:
+            retried = Task.objects.filter(status=Task.FAILED).update(
+                status=Task.PENDING,
+                attempts=0,
+                run_at=timezone.now()
+            )
+            self.stdout.write(f'Failed tasks requeued: {retried}')
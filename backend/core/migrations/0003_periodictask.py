@@ -0,0 +1,26 @@
+# Generated by Django 4.2.23 on 2026-10-18 07:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_collectionversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodicTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Функция')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующий запуск')),
+            ],
+            options={
+                'verbose_name': 'периодическая задача',
+                'verbose_name_plural': 'Периодические задачи',
+            },
+        ),
+    ]
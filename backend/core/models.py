@@ -0,0 +1,132 @@
+from django.db import models
+from django.utils import timezone
+
+from foodgram.constants import (
+    MAX_COLLECTION_NAME,
+    MAX_TASK_NAME,
+    MAX_TASK_STATUS,
+    TASK_MAX_ATTEMPTS
+)
+
+
+class Task(models.Model):
+    """
+    Отложенная задача фоновой очереди. Создаётся в той же транзакции,
+    что и изменение данных, и выполняется командой run_tasks.
+    Успешно выполненные задачи удаляются.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=MAX_TASK_NAME,
+        verbose_name='Функция'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Аргументы'
+    )
+    status = models.CharField(
+        max_length=MAX_TASK_STATUS,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=TASK_MAX_ATTEMPTS,
+        verbose_name='Максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить после'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана'
+    )
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('run_at',)
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='task_status_run_at_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+
+class CollectionVersion(models.Model):
+    """
+    Счётчик изменений набора объектов (например, всех тегов). Меняется в
+    той же транзакции, что и сами объекты, и служит валидатором для
+    условных GET-запросов.
+    """
+    name = models.CharField(
+        max_length=MAX_COLLECTION_NAME,
+        unique=True,
+        verbose_name='Коллекция'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия'
+    )
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Изменена'
+    )
+
+    class Meta:
+        verbose_name = 'версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class PeriodicTask(models.Model):
+    """
+    Расписание периодической задачи из settings.PERIODIC_TASKS. Строка
+    блокируется на время постановки задачи в очередь, поэтому задачу
+    ставит только один из процессов.
+    """
+    name = models.CharField(
+        max_length=MAX_TASK_NAME,
+        unique=True,
+        verbose_name='Функция'
+    )
+    next_run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующий запуск'
+    )
+
+    class Meta:
+        verbose_name = 'периодическая задача'
+        verbose_name_plural = 'Периодические задачи'
+
+    def __str__(self):
+        return self.name
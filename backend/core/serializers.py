@@ -1,18 +1,36 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from recipes.images import get_rendition_urls
 from recipes.models import Recipe
 
 User = get_user_model()
 
 
 class ShortRecipeSerializer(serializers.ModelSerializer):
-    """Сериализатор для рецептов (сокращённая версия)."""
+    """
+    Сериализатор для рецептов (сокращённая версия).
+    Поле thumbnail содержит уменьшенную версию изображения, а пока она не
+    готова - исходное изображение.
+    """
+    thumbnail = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
         fields = (
             'id',
             'name',
             'image',
+            'thumbnail',
             'cooking_time'
         )
+
+    def get_thumbnail(self, obj):
+        request = self.context.get('request')
+        thumbnail = get_rendition_urls(obj, request).get('thumbnail')
+        if thumbnail or not obj.image:
+            return thumbnail
+        return (
+            request.build_absolute_uri(obj.image.url)
+            if request else obj.image.url
+        )
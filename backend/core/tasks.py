@@ -0,0 +1,204 @@
+"""Фоновая очередь задач в базе данных."""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from foodgram.constants import (
+    PERIODIC_TASKS_CHECK_INTERVAL,
+    TASK_BATCH_SIZE,
+    TASK_LOCK_TIMEOUT,
+    TASK_RETRY_BACKOFF,
+    TASK_RETRY_BACKOFF_MAX
+)
+
+from .models import PeriodicTask, Task
+
+logger = logging.getLogger(__name__)
+
+next_periodic_check = 0
+
+
+def task(func):
+    """
+    Регистрирует функцию как фоновую задачу и добавляет ей метод delay.
+    Аргументы передаются только по имени и должны сериализоваться в JSON.
+    """
+    name = f'{func.__module__}.{func.__name__}'
+
+    def delay(**kwargs):
+        return enqueue(name, func, kwargs)
+
+    func.is_task = True
+    func.delay = delay
+    return func
+
+
+def enqueue(name, func, kwargs):
+    """
+    Ставит задачу в очередь в текущей транзакции: при откате задача
+    не выполнится. Задачи должны быть идемпотентны: если такая же задача
+    уже готова к выполнению, новая не создаётся. Задача, отложенная до
+    повторной попытки, дубликатом не считается: иначе новые изменения
+    ждали бы окончания её задержки. При settings.TASK_QUEUE_EAGER
+    задача выполняется в этом же процессе после фиксации транзакции.
+    """
+    if settings.TASK_QUEUE_EAGER:
+        transaction.on_commit(lambda: run_eager(name, func, kwargs))
+        return None
+    queued = Task.objects.filter(
+        name=name,
+        kwargs=kwargs,
+        status=Task.PENDING,
+        run_at__lte=timezone.now()
+    ).first()
+    return queued or Task.objects.create(name=name, kwargs=kwargs)
+
+
+def run_eager(name, func, kwargs):
+    """Ошибка задачи не должна прерывать запрос, который её поставил."""
+    try:
+        func(**kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', name)
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной попыткой."""
+    return timedelta(seconds=min(
+        TASK_RETRY_BACKOFF * 2 ** (attempts - 1),
+        TASK_RETRY_BACKOFF_MAX
+    ))
+
+
+def claim_tasks(limit=TASK_BATCH_SIZE):
+    """
+    Забирает в работу готовые к выполнению задачи, а также задачи,
+    зависшие дольше TASK_LOCK_TIMEOUT (например, после падения worker).
+    Заблокированные другим worker строки пропускаются.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Task.PENDING, run_at__lte=now)
+                | Q(
+                    status=Task.RUNNING,
+                    locked_at__lt=now - timedelta(seconds=TASK_LOCK_TIMEOUT)
+                )
+            ).order_by('run_at')[:limit]
+        )
+        Task.objects.filter(pk__in=[item.pk for item in tasks]).update(
+            status=Task.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+    for item in tasks:
+        item.attempts += 1
+    return tasks
+
+
+def execute_task(item):
+    """
+    Выполняет задачу. Успешная задача удаляется, упавшая планируется
+    повторно с задержкой или помечается как FAILED после max_attempts.
+    """
+    try:
+        func = import_string(item.name)
+        if not getattr(func, 'is_task', False):
+            raise ImportError(f'{item.name} не является задачей')
+        func(**item.kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', item)
+        item.last_error = traceback.format_exc()
+        item.locked_at = None
+        if item.attempts >= item.max_attempts:
+            item.status = Task.FAILED
+        else:
+            item.status = Task.PENDING
+            item.run_at = timezone.now() + get_retry_delay(item.attempts)
+        item.save(update_fields=(
+            'status',
+            'run_at',
+            'locked_at',
+            'last_error'
+        ))
+        return False
+    item.delete()
+    return True
+
+
+def schedule_periodic_tasks():
+    """
+    Ставит в очередь задачи из settings.PERIODIC_TASKS (путь к задаче:
+    интервал в секундах), время запуска которых наступило, и назначает
+    следующий запуск через интервал. Строка расписания PeriodicTask
+    блокируется, поэтому одновременно работающие процессы не ставят одну
+    задачу дважды. Возвращает число поставленных задач.
+    """
+    periodic = settings.PERIODIC_TASKS
+    if not periodic:
+        return 0
+    now = timezone.now()
+    PeriodicTask.objects.bulk_create(
+        (PeriodicTask(name=name, next_run_at=now) for name in periodic),
+        ignore_conflicts=True
+    )
+    with transaction.atomic():
+        due = list(
+            PeriodicTask.objects.select_for_update(skip_locked=True).filter(
+                name__in=periodic,
+                next_run_at__lte=now
+            )
+        )
+        for item in due:
+            enqueue(item.name, import_string(item.name), {})
+            item.next_run_at = now + timedelta(seconds=periodic[item.name])
+        PeriodicTask.objects.bulk_update(due, ('next_run_at', ))
+    return len(due)
+
+
+def schedule_periodic_tasks_eagerly(**kwargs):
+    """
+    Обработчик request_finished для settings.TASK_QUEUE_EAGER: без worker
+    расписание проверяется после запросов, но не чаще, чем раз в
+    PERIODIC_TASKS_CHECK_INTERVAL секунд в каждом процессе.
+    """
+    global next_periodic_check
+    if time.monotonic() < next_periodic_check:
+        return
+    next_periodic_check = time.monotonic() + PERIODIC_TASKS_CHECK_INTERVAL
+    try:
+        schedule_periodic_tasks()
+    except Exception:
+        logger.exception('Не удалось поставить периодические задачи')
+
+
+def run_pending_tasks(limit=TASK_BATCH_SIZE):
+    """Выполняет пачку задач и возвращает число взятых в работу."""
+    tasks = claim_tasks(limit)
+    for item in tasks:
+        execute_task(item)
+    return len(tasks)
+
+
+def get_queue_stats():
+    """Глубина очереди по статусам и возраст самой старой готовой задачи."""
+    now = timezone.now()
+    ready = Q(status=Task.PENDING, run_at__lte=now)
+    stats = Task.objects.aggregate(
+        ready=Count('pk', filter=ready),
+        delayed=Count('pk', filter=Q(status=Task.PENDING, run_at__gt=now)),
+        running=Count('pk', filter=Q(status=Task.RUNNING)),
+        failed=Count('pk', filter=Q(status=Task.FAILED)),
+        oldest=Min('run_at', filter=ready),
+    )
+    oldest = stats.pop('oldest')
+    stats['oldest_age'] = (now - oldest).total_seconds() if oldest else 0
+    return stats
@@ -0,0 +1,177 @@
+import base64
+import os
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.fields import decode_base64_to_file
+from core.loaders import TTLCachedLoader
+from core.models import PeriodicTask, Task
+from core.tasks import (
+    claim_tasks,
+    enqueue,
+    execute_task,
+    run_pending_tasks,
+    schedule_periodic_tasks,
+    schedule_periodic_tasks_eagerly
+)
+from foodgram.constants import BASE64_CHUNK_SIZE
+
+CALLS = []
+
+
+def record(**kwargs):
+    CALLS.append(kwargs)
+
+
+def fail(**kwargs):
+    raise ValueError('ошибка')
+
+
+record.is_task = fail.is_task = True
+RECORD = f'{__name__}.record'
+FAIL = f'{__name__}.fail'
+
+
+@override_settings(TASK_QUEUE_EAGER=False)
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_due_duplicate_is_not_queued(self):
+        first = enqueue(RECORD, record, {'value': 1})
+        self.assertEqual(enqueue(RECORD, record, {'value': 1}), first)
+        enqueue(RECORD, record, {'value': 2})
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_task_delayed_for_retry_is_not_a_duplicate(self):
+        delayed = enqueue(RECORD, record, {'value': 1})
+        Task.objects.filter(pk=delayed.pk).update(
+            run_at=timezone.now() + timedelta(hours=1)
+        )
+        fresh = enqueue(RECORD, record, {'value': 1})
+        self.assertNotEqual(fresh.pk, delayed.pk)
+        self.assertEqual(run_pending_tasks(), 1)
+        self.assertEqual(CALLS, [{'value': 1}])
+
+    def test_successful_task_is_deleted(self):
+        enqueue(RECORD, record, {'value': 1})
+        self.assertEqual(run_pending_tasks(), 1)
+        self.assertEqual(CALLS, [{'value': 1}])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_with_backoff(self):
+        enqueue(FAIL, fail, {})
+        item, = claim_tasks()
+        with self.assertLogs('core.tasks', 'ERROR'):
+            self.assertFalse(execute_task(item))
+        item.refresh_from_db()
+        self.assertEqual(item.status, Task.PENDING)
+        self.assertEqual(item.attempts, 1)
+        self.assertGreater(item.run_at, timezone.now())
+        self.assertIn('ValueError', item.last_error)
+        self.assertEqual(claim_tasks(), [])
+
+    def test_task_fails_after_max_attempts(self):
+        task = enqueue(FAIL, fail, {})
+        Task.objects.filter(pk=task.pk).update(max_attempts=1)
+        item, = claim_tasks()
+        with self.assertLogs('core.tasks', 'ERROR'):
+            execute_task(item)
+        item.refresh_from_db()
+        self.assertEqual(item.status, Task.FAILED)
+
+    @override_settings(TASK_QUEUE_EAGER=True)
+    def test_eager_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(RECORD, record, {'value': 1})
+            self.assertEqual(CALLS, [])
+        self.assertEqual(CALLS, [{'value': 1}])
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(TASK_QUEUE_EAGER=False, PERIODIC_TASKS={RECORD: 60})
+class PeriodicTaskTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_is_queued_once_per_interval(self):
+        self.assertEqual(schedule_periodic_tasks(), 1)
+        self.assertEqual(schedule_periodic_tasks(), 0)
+        self.assertEqual(Task.objects.filter(name=RECORD).count(), 1)
+        schedule = PeriodicTask.objects.get(name=RECORD)
+        self.assertGreater(
+            schedule.next_run_at,
+            timezone.now() + timedelta(seconds=50)
+        )
+
+    def test_task_is_queued_again_when_due(self):
+        schedule_periodic_tasks()
+        run_pending_tasks()
+        PeriodicTask.objects.update(next_run_at=timezone.now())
+        self.assertEqual(schedule_periodic_tasks(), 1)
+        run_pending_tasks()
+        self.assertEqual(CALLS, [{}, {}])
+
+    def test_pending_run_is_not_duplicated(self):
+        schedule_periodic_tasks()
+        PeriodicTask.objects.update(next_run_at=timezone.now())
+        schedule_periodic_tasks()
+        self.assertEqual(Task.objects.filter(name=RECORD).count(), 1)
+
+    @override_settings(TASK_QUEUE_EAGER=True)
+    def test_eager_schedule_runs_task(self):
+        tasks.next_periodic_check = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_periodic_tasks_eagerly()
+        self.assertEqual(CALLS, [{}])
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_periodic_tasks_eagerly()
+        self.assertEqual(CALLS, [{}])
+
+
+class TTLCachedLoaderTests(SimpleTestCase):
+    """Данные загружаются один раз до истечения срока или сброса."""
+
+    def setUp(self):
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.loads
+
+    def test_loaded_once_within_ttl(self):
+        loader = TTLCachedLoader(self.load, 60)
+        self.assertIsNone(loader.peek())
+        self.assertEqual(loader.get(), 1)
+        self.assertEqual(loader.get(), 1)
+        self.assertEqual(loader.peek(), 1)
+
+    def test_reloaded_after_invalidate_and_expiry(self):
+        loader = TTLCachedLoader(self.load, 60)
+        loader.get()
+        loader.invalidate()
+        self.assertEqual(loader.get(), 2)
+        loader.ttl = 0
+        loader.invalidate()
+        loader.get()
+        self.assertEqual(loader.get(), 4)
+
+
+class Base64DecodeTests(SimpleTestCase):
+    """base64 декодируется по частям так же, как целиком."""
+
+    def test_line_wrapped_payload(self):
+        content = os.urandom(BASE64_CHUNK_SIZE * 3)
+        for separator in ('\n', '\r\n'):
+            with self.subTest(separator=separator):
+                data = base64.encodebytes(content).decode().replace(
+                    '\n', separator
+                )
+                file = decode_base64_to_file(data, 'a.png', 'image/png')
+                self.assertEqual(file.size, len(content))
+                self.assertEqual(file.read(), content)
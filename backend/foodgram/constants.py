@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 MAX_NAME_LENGTH = 50
 
 MAX_TAG_NAME = 32
@@ -16,3 +18,53 @@ PAGE_SIZE = 6
 
 PAGE_QUERY_PARAM = 'page'
 PAGE_SIZE_QUERY_PARAM = 'limit'
+CURSOR_QUERY_PARAM = 'cursor'
+
+PAGINATION_COUNT_TIMEOUT = 60
+PAGINATION_APPROXIMATE_THRESHOLD = 10000
+
+INGREDIENT_INDEX_TTL = 300
+INGREDIENT_NGRAM_SIZE = 3
+
+SHOPPING_LIST_CHUNK_SIZE = 2000
+SHOPPING_LIST_BATCH_SIZE = 1000
+
+BASE64_CHUNK_SIZE = 64 * 1024
+
+IMAGE_RENDITIONS = {
+    'thumbnail': 160,
+    'card': 480,
+    'full': 1280,
+}
+IMAGE_RENDITION_FORMAT = 'WEBP'
+IMAGE_RENDITION_QUALITY = 80
+
+MAX_TASK_NAME = 255
+MAX_TASK_STATUS = 16
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BACKOFF = 10
+TASK_RETRY_BACKOFF_MAX = 3600
+TASK_LOCK_TIMEOUT = 600
+TASK_BATCH_SIZE = 20
+TASK_POLL_INTERVAL = 1.0
+PERIODIC_TASKS_CHECK_INTERVAL = 30
+
+MAX_COLLECTION_NAME = 32
+
+CATALOGUE_VERSION_LENGTH = 16
+CATALOGUE_SNAPSHOTS_KEPT = 3
+CATALOGUE_MAX_AGE = 60 * 60 * 24 * 365
+
+FEED_FANOUT_THRESHOLD = 1000
+FEED_BACKFILL_LIMIT = 100
+FEED_FANOUT_BATCH_SIZE = 1000
+
+RECIPE_ID_SET_TTL = 300
+SHORT_LINK_MAX_AGE = 60 * 60 * 24
+SHORT_LINK_NOT_FOUND_MAX_AGE = 60
+
+TRENDING_HALF_LIFE = 60 * 60 * 48
+TRENDING_WINDOW_DAYS = 14
+TRENDING_UPDATE_INTERVAL = 60 * 15
+TRENDING_UPDATE_BATCH_SIZE = 1000
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
@@ -4,7 +4,7 @@ from pathlib import Path
 from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
 
-from .constants import PAGE_SIZE
+from .constants import PAGE_SIZE, TRENDING_UPDATE_INTERVAL
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'recipes.apps.RecipesConfig',
     'users.apps.UsersConfig',
@@ -77,8 +78,41 @@ DATABASES = {
     },
 }
 
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+# Ответы API кэшируются только в общем для всех процессов кэше: после
+# записи версию группы сбрасывает один воркер, а кэш в памяти остальных
+# продолжал бы отдавать устаревшие ответы. Поэтому без REDIS_URL, с
+# кэшем LocMemCache по умолчанию, кэш ответов и его счётчики выключены.
+API_CACHE_ENABLED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 AUTH_USER_MODEL = 'users.User'
 
+INGREDIENT_SEARCH_IN_MEMORY = os.getenv(
+    'INGREDIENT_SEARCH_IN_MEMORY', 'True'
+).lower() == 'true'
+
+TASK_QUEUE_EAGER = os.getenv('TASK_QUEUE_EAGER', 'False').lower() == 'true'
+PERIODIC_TASKS = {
+    'recipes.trending.update_trending_scores': TRENDING_UPDATE_INTERVAL,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -124,6 +158,8 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': PAGE_SIZE,
 }
 
+PAGINATION_COUNT = os.getenv('PAGINATION_COUNT', 'exact')
+
 
 CORS_ALLOWED_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ALLOWED_ORIGINS', '').split(',')]
 
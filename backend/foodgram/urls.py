@@ -5,7 +5,13 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from link_shortner.views import get_short_link, redirect_short_link
-from recipes.views import IngredientViewSet, RecipeViewSet, TagViewSet
+from recipes.views import (
+    IngredientViewSet,
+    RecipeViewSet,
+    TagViewSet,
+    catalogue,
+    catalogue_snapshot
+)
 from users.views import UserViewSet
 
 router = DefaultRouter()
@@ -17,6 +23,12 @@ router.register(r'recipes', RecipeViewSet, basename='recipe')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('djoser.urls.authtoken')),
+    path('api/catalogue/', catalogue, name='catalogue'),
+    path(
+        'api/catalogue/<slug:version>/',
+        catalogue_snapshot,
+        name='catalogue_snapshot'
+    ),
     path('api/', include(router.urls)),
     path(
         'api/recipes/<int:recipe_pk>/get-link/',
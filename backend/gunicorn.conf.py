@@ -0,0 +1,8 @@
+"""Настройки gunicorn; значения можно переопределить переменными окружения."""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+wsgi_app = 'foodgram.wsgi:application'
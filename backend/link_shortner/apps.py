@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LinkShortnerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'link_shortner'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,66 @@
+"""Проверка существования рецептов без обращения к базе данных."""
+from core.loaders import TTLCachedLoader
+from foodgram.constants import RECIPE_ID_SET_TTL
+from recipes.models import Recipe
+
+
+def set_bit(bitmap, number):
+    if number >= len(bitmap) * 8:
+        bitmap.extend(bytes(number // 8 + 1 - len(bitmap)))
+    bitmap[number >> 3] |= 1 << (number & 7)
+
+
+class RecipeIdSet:
+    """
+    Битовая карта id существующих рецептов в памяти процесса.
+
+    Карта строится при первом обращении, дополняется сигналами рецептов
+    и перестраивается по истечении RECIPE_ID_SET_TTL. Отсутствие id в
+    карте перепроверяется запросом к базе: рецепт мог быть создан в
+    другом процессе, а на SQLite id удалённого рецепта выдаётся снова.
+    """
+
+    def __init__(self, ttl=RECIPE_ID_SET_TTL):
+        self._bitmap = TTLCachedLoader(self._build, ttl)
+
+    def invalidate(self):
+        self._bitmap.invalidate()
+
+    def contains(self, recipe_id):
+        bitmap = self._bitmap.get()
+        return 0 <= recipe_id < len(bitmap) * 8 and bool(
+            bitmap[recipe_id >> 3] & (1 << (recipe_id & 7))
+        )
+
+    def exists(self, recipe_id):
+        """Проверяет рецепт по карте, а при отсутствии - запросом к базе."""
+        if self.contains(recipe_id):
+            return True
+        if not Recipe.objects.filter(id=recipe_id).exists():
+            return False
+        self.add(recipe_id)
+        return True
+
+    def add(self, recipe_id):
+        with self._bitmap.lock:
+            bitmap = self._bitmap.peek()
+            if bitmap is not None:
+                set_bit(bitmap, recipe_id)
+
+    def discard(self, recipe_id):
+        with self._bitmap.lock:
+            bitmap = self._bitmap.peek()
+            if bitmap is not None and recipe_id < len(bitmap) * 8:
+                bitmap[recipe_id >> 3] &= ~(1 << (recipe_id & 7)) & 0xFF
+
+    def _build(self):
+        bitmap = bytearray()
+        for recipe_id in Recipe.objects.values_list(
+            'id',
+            flat=True
+        ).iterator():
+            set_bit(bitmap, recipe_id)
+        return bitmap
+
+
+recipe_ids = RecipeIdSet()
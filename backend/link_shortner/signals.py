@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Recipe
+from .recipe_ids import recipe_ids
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_id(sender, instance, created, **kwargs):
+    if created:
+        recipe_id = instance.id
+        transaction.on_commit(lambda: recipe_ids.add(recipe_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def discard_recipe_id(sender, instance, **kwargs):
+    recipe_id = instance.id
+    transaction.on_commit(lambda: recipe_ids.discard(recipe_id))
@@ -0,0 +1,43 @@
+from django.urls import reverse
+from short_url import encode_url
+
+from link_shortner.recipe_ids import recipe_ids
+from recipes.tests.base import RecipeAPITestCase, create_recipe
+
+
+class ShortLinkTests(RecipeAPITestCase):
+    """Короткая ссылка ведёт на рецепт, пока он существует."""
+
+    def setUp(self):
+        super().setUp()
+        recipe_ids.invalidate()
+
+    def get_location(self, recipe_id):
+        response = self.client.get(reverse(
+            'redirect_short_link',
+            kwargs={'short_code': encode_url(recipe_id)}
+        ))
+        self.assertEqual(response.status_code, 302)
+        return response['Location']
+
+    def test_redirects_to_recipe(self):
+        self.assertTrue(self.get_location(self.porridge.id).endswith(
+            f'/recipes/{self.porridge.id}'
+        ))
+
+    def test_deleted_recipe_is_not_found(self):
+        recipe_id = self.pancakes.id
+        self.get_location(recipe_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pancakes.delete()
+        self.assertTrue(self.get_location(recipe_id).endswith('/not_found'))
+
+    def test_reused_id_is_checked_in_database(self):
+        recipe_id = self.pancakes.id
+        self.get_location(recipe_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pancakes.delete()
+        create_recipe(self.author, {self.salt: 1}, id=recipe_id)
+        self.assertTrue(
+            self.get_location(recipe_id).endswith(f'/recipes/{recipe_id}')
+        )
@@ -2,11 +2,16 @@
 
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from short_url import decode_url, encode_url
 
-from recipes.models import Recipe
+from foodgram.constants import (
+    SHORT_LINK_MAX_AGE,
+    SHORT_LINK_NOT_FOUND_MAX_AGE
+)
+from .recipe_ids import recipe_ids
 
 
 @api_view(['GET'])
@@ -19,11 +24,37 @@ def get_short_link(request, recipe_pk):
     return Response({'short-link': full_url})
 
 
-def redirect_short_link(request, short_code):
-    """Переадресовывает с короткой ссылки на полную страницу рецепта."""
+def decode_short_code(short_code):
     try:
-        recipe_id = decode_url(short_code)
-        Recipe.objects.get(id=recipe_id)
-        return redirect(f'https://{request.get_host()}/recipes/{recipe_id}')
-    except (ValueError, Recipe.DoesNotExist):
-        return redirect(f'https://{request.get_host()}/not_found')
+        return decode_url(short_code)
+    except ValueError:
+        return None
+
+
+def get_recipe_redirect(request, recipe_id):
+    """
+    Переадресация на рецепт или на страницу not_found. Ответ разрешено
+    кэшировать, в том числе nginx: ссылка на рецепт не меняется, а
+    отсутствие рецепта кэшируется недолго - он может скоро появиться.
+    """
+    if recipe_id is None:
+        response = redirect(f'https://{request.get_host()}/not_found')
+        max_age = SHORT_LINK_NOT_FOUND_MAX_AGE
+    else:
+        response = redirect(
+            f'https://{request.get_host()}/recipes/{recipe_id}'
+        )
+        max_age = SHORT_LINK_MAX_AGE
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def redirect_short_link(request, short_code):
+    """
+    Переадресовывает с короткой ссылки на полную страницу рецепта.
+    Существование рецепта проверяется по карте id в памяти процесса.
+    """
+    recipe_id = decode_short_code(short_code)
+    if recipe_id is not None and not recipe_ids.exists(recipe_id):
+        recipe_id = None
+    return get_recipe_redirect(request, recipe_id)
@@ -8,6 +8,10 @@ from .models import (
     ShoppingCart,
     Tag
 )
+from .shopping_list import (
+    apply_recipe_changes_to_shopping_lists,
+    get_recipe_amounts
+)
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -24,7 +28,7 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         'name',
         'author',
-        'get_favorites_count',
+        'favorites_count',
     )
     search_fields = (
         'author__username',
@@ -37,7 +41,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'name',
     )
     readonly_fields = (
-        'get_favorites_count',
+        'favorites_count',
     )
     filter_horizontal = (
         'tags',
@@ -47,9 +51,15 @@ class RecipeAdmin(admin.ModelAdmin):
         IngredientRecipeInline,
     )
 
-    @admin.display(description='В избранном')
-    def get_favorites_count(self, obj):
-        return obj.favorite_recipe.count()
+    def save_related(self, request, form, formsets, change):
+        old_amounts = get_recipe_amounts(form.instance.id) if change else {}
+        super().save_related(request, form, formsets, change)
+        if change:
+            apply_recipe_changes_to_shopping_lists(
+                form.instance.id,
+                old_amounts,
+                get_recipe_amounts(form.instance.id)
+            )
 
 
 class IngredientAdmin(admin.ModelAdmin):
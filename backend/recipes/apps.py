@@ -6,3 +6,6 @@ class RecipesConfig(AppConfig):
     name = 'recipes'
     verbose_name = 'рецепт'
     verbose_name_plural = 'рецепты'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,156 @@
+"""
+Снимок справочника тегов и ингредиентов для бессрочного кэширования.
+
+Справочник сериализуется целиком, заранее сжимается и хранится в
+CatalogueSnapshot. Адрес снимка содержит хэш содержимого, поэтому ответ
+по нему не меняется и кэшируется клиентами и nginx как immutable, а
+/api/catalogue/ переадресует на снимок актуальной версии. Снимок
+перестраивается фоновой задачей при изменении тегов или ингредиентов.
+"""
+import gzip
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.conditional import get_collection_versions
+from core.tasks import task
+from foodgram.constants import (
+    CATALOGUE_SNAPSHOTS_KEPT,
+    CATALOGUE_VERSION_LENGTH
+)
+from .models import CatalogueSnapshot, Ingredient, Tag
+from .serializers import IngredientDisplaySerializer, TagReadSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CATALOGUE_KEY = 'catalogue:{}:{}'
+# Поле снимка для каждого Content-Encoding в порядке предпочтения.
+ENCODED_CONTENT = {
+    'br': 'brotli_content',
+    'gzip': 'gzip_content',
+}
+
+
+def render_catalogue():
+    """JSON справочника в том же виде, что и /api/tags/ и /api/ingredients/."""
+    return JSONRenderer().render({
+        'tags': TagReadSerializer(
+            Tag.objects.order_by('id'),
+            many=True
+        ).data,
+        'ingredients': IngredientDisplaySerializer(
+            Ingredient.objects.order_by('id'),
+            many=True
+        ).data,
+    })
+
+
+def save_catalogue_snapshot(tags_version, ingredients_version):
+    """
+    Сохраняет снимок справочника для версий коллекций и удаляет старые
+    снимки, кроме CATALOGUE_SNAPSHOTS_KEPT последних. Если справочник
+    не изменился, у существующего снимка обновляются только версии.
+    Возвращает версию снимка.
+    """
+    content = render_catalogue()
+    version = sha256(content).hexdigest()[:CATALOGUE_VERSION_LENGTH]
+    versions = {
+        'tags_version': tags_version,
+        'ingredients_version': ingredients_version,
+        'built_at': timezone.now(),
+    }
+    if not CatalogueSnapshot.objects.filter(version=version).update(
+        **versions
+    ):
+        try:
+            with transaction.atomic():
+                CatalogueSnapshot.objects.create(
+                    version=version,
+                    content=content,
+                    gzip_content=gzip.compress(content, 9, mtime=0),
+                    brotli_content=(
+                        brotli.compress(content) if brotli else None
+                    ),
+                    **versions
+                )
+        except IntegrityError:
+            pass
+    CatalogueSnapshot.objects.filter(pk__in=list(
+        CatalogueSnapshot.objects.values_list(
+            'pk',
+            flat=True
+        )[CATALOGUE_SNAPSHOTS_KEPT:]
+    )).delete()
+    return version
+
+
+def get_catalogue_version():
+    """
+    Версия снимка для текущих версий тегов и ингредиентов. Если его ещё
+    нет, он строится сразу.
+    """
+    versions = get_collection_versions('tags', 'ingredients')
+    tags_version, ingredients_version = (
+        versions['tags'][0],
+        versions['ingredients'][0]
+    )
+    key = CATALOGUE_KEY.format(tags_version, ingredients_version)
+    version = cache.get(key)
+    if version is None:
+        version = CatalogueSnapshot.objects.filter(
+            tags_version=tags_version,
+            ingredients_version=ingredients_version
+        ).values_list('version', flat=True).first()
+        if version is None:
+            version = save_catalogue_snapshot(
+                tags_version,
+                ingredients_version
+            )
+        cache.set(key, version, settings.API_CACHE_TIMEOUT)
+    return version
+
+
+@task
+def rebuild_catalogue_snapshot():
+    """Строит снимок справочника заранее, чтобы его не ждал запрос."""
+    return get_catalogue_version()
+
+
+def get_catalogue_content(version, accept_encoding):
+    """
+    Содержимое снимка в лучшей кодировке из Accept-Encoding:
+    (Content-Encoding или None, данные). Если снимка нет, возвращает None.
+    """
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, quality = item.partition(';')
+        try:
+            weight = float(quality.strip().partition('q=')[2] or 1)
+        except ValueError:
+            continue
+        if weight > 0:
+            accepted.add(coding.strip().lower())
+    encodings = [
+        encoding for encoding in ENCODED_CONTENT if encoding in accepted
+    ]
+    fields = [ENCODED_CONTENT[encoding] for encoding in encodings]
+    if 'gzip' not in accepted:
+        encodings.append(None)
+        fields.append('content')
+    row = CatalogueSnapshot.objects.filter(
+        version=version
+    ).values_list(*fields).first()
+    if row is None:
+        return None
+    return next(
+        (encoding, bytes(content))
+        for encoding, content in zip(encodings, row)
+        if content is not None
+    )
@@ -0,0 +1,171 @@
+"""
+Лента рецептов авторов, на которых подписан пользователь.
+
+Новый рецепт записывается в ленты (FeedEntry) всех подписчиков автора
+фоновой задачей. Автор, у которого при публикации оказывается больше
+FEED_FANOUT_THRESHOLD подписчиков, навсегда переводится на чтение:
+его рецепты не копируются, а подмешиваются к ленте запросом по автору.
+Оба источника читаются по индексу в пределах страницы, поэтому чтение
+ленты не зависит от числа подписок.
+При подписке в ленту добавляются последние FEED_BACKFILL_LIMIT рецептов
+автора, при отписке его рецепты из ленты удаляются.
+"""
+from django.contrib.auth import get_user_model
+
+from core.tasks import task
+from foodgram.constants import (
+    FEED_BACKFILL_LIMIT,
+    FEED_FANOUT_BATCH_SIZE,
+    FEED_FANOUT_THRESHOLD
+)
+from users.models import Subscriptions
+from .models import FeedEntry, Recipe
+
+User = get_user_model()
+
+
+def schedule_fan_out(recipe):
+    """
+    Ставит в очередь рассылку рецепта, если её есть кому получать.
+    Счётчик подписчиков и флаг автора читаются из базы: в объекте
+    пользователя из запроса они могут быть устаревшими.
+    """
+    followers_count, fan_out_on_read = User.objects.filter(
+        pk=recipe.author_id
+    ).values_list('followers_count', 'fan_out_on_read').get()
+    if followers_count and not fan_out_on_read:
+        fan_out_recipe.delay(recipe_id=recipe.id)
+
+
+@task
+def fan_out_recipe(recipe_id):
+    """
+    Записывает рецепт в ленты подписчиков автора или переводит автора
+    на чтение. Возвращает число записей.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).values_list(
+        'author_id',
+        'author__followers_count',
+        'author__fan_out_on_read'
+    ).first()
+    if recipe is None:
+        return 0
+    author_id, followers_count, fan_out_on_read = recipe
+    if fan_out_on_read:
+        return 0
+    if followers_count > FEED_FANOUT_THRESHOLD:
+        User.objects.filter(pk=author_id).update(fan_out_on_read=True)
+        return 0
+    return len(FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(user_id=user_id, recipe_id=recipe_id)
+            for user_id in Subscriptions.objects.filter(
+                author_id=author_id
+            ).values_list('user_id', flat=True)
+        ),
+        batch_size=FEED_FANOUT_BATCH_SIZE,
+        ignore_conflicts=True
+    ))
+
+
+@task
+def add_author_to_feed(user_id, author_id):
+    """Добавляет в ленту последние рецепты автора, если подписка ещё есть."""
+    if not Subscriptions.objects.filter(
+        user_id=user_id,
+        author_id=author_id,
+        author__fan_out_on_read=False
+    ).exists():
+        return 0
+    return len(FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(user_id=user_id, recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-id').values_list('id', flat=True)[
+                :FEED_BACKFILL_LIMIT
+            ]
+        ),
+        ignore_conflicts=True
+    ))
+
+
+def remove_author_from_feed(user_id, author_id):
+    FeedEntry.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id
+    ).delete()
+
+
+def rebuild_feeds():
+    """
+    Заполняет ленты по текущим подпискам: переводит на чтение авторов,
+    у которых больше FEED_FANOUT_THRESHOLD подписчиков, и записывает
+    остальным подписчикам последние рецепты авторов. Существующие записи
+    не дублируются. Возвращает число новых записей.
+    """
+    User.objects.filter(
+        followers_count__gt=FEED_FANOUT_THRESHOLD
+    ).update(fan_out_on_read=True)
+    followers = {}
+    for user_id, author_id in Subscriptions.objects.filter(
+        author__fan_out_on_read=False
+    ).values_list('user_id', 'author_id').iterator():
+        followers.setdefault(author_id, []).append(user_id)
+    created = 0
+    for author_id, user_ids in followers.items():
+        recipe_ids = Recipe.objects.filter(
+            author_id=author_id
+        ).order_by('-id').values_list('id', flat=True)[:FEED_BACKFILL_LIMIT]
+        created += len(FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(user_id=user_id, recipe_id=recipe_id)
+                for recipe_id in recipe_ids
+                for user_id in user_ids
+            ),
+            batch_size=FEED_FANOUT_BATCH_SIZE,
+            ignore_conflicts=True
+        ))
+    return created
+
+
+def get_pull_author_ids(request):
+    """
+    Загружает подписки пользователя одним запросом: запоминает их для
+    поля is_subscribed и возвращает авторов, которые читаются по запросу.
+    """
+    subscriptions = list(Subscriptions.objects.filter(
+        user=request.user
+    ).values_list('author_id', 'author__fan_out_on_read'))
+    request.followed_author_ids = {
+        author_id for author_id, _ in subscriptions
+    }
+    return [
+        author_id for author_id, fan_out_on_read in subscriptions
+        if fan_out_on_read
+    ]
+
+
+def get_feed_recipe_ids(user, pull_author_ids, limit, position=None,
+                        reverse=False):
+    """
+    id не более limit рецептов ленты, ближайших к position (id рецепта)
+    в направлении страницы: сначала новые, при reverse - старые.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    recipes = Recipe.objects.filter(author_id__in=pull_author_ids)
+    if position is not None:
+        lookup = 'gt' if reverse else 'lt'
+        entries = entries.filter(**{f'recipe_id__{lookup}': position})
+        recipes = recipes.filter(**{f'id__{lookup}': position})
+    direction = '' if reverse else '-'
+    ids = set(entries.order_by(f'{direction}recipe_id').values_list(
+        'recipe_id',
+        flat=True
+    )[:limit])
+    if pull_author_ids:
+        ids.update(recipes.order_by(f'{direction}id').values_list(
+            'id',
+            flat=True
+        )[:limit])
+    return sorted(ids, reverse=not reverse)[:limit]
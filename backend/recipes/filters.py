@@ -1,47 +1,73 @@
-from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models import (
+    Case,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Value,
+    When
+)
 from django_filters import rest_framework as filters
 
 from .models import Ingredient, Recipe, Tag
 
+RECIPE_ORDERINGS = {
+    'newest': ('-id', ),
+    'popular': ('-favorites_count', '-id'),
+    'trending': ('-trending_score', '-id'),
+    'cooking_time': ('cooking_time', '-id'),
+}
 
-class IngredientFilter(filters.FilterSet):
+
+class NameSearchMixin:
     """
-    Фильтрует ингредиенты для рецепта по вхождению в начало и в середину слова.
+    Поиск по полю name: сначала совпадения по началу названия, затем по
+    вхождению, затем порядок из name_ordering. Результат одинаков на всех
+    СУБД; на PostgreSQL условие icontains (UPPER(name) LIKE ...)
+    обслуживается триграммными GIN-индексами по UPPER(name).
     """
-    name = filters.CharFilter(method='filter_by_name')
-
-    class Meta:
-        model = Ingredient
-        fields = ('name', )
+    name_ordering = ('name', )
 
     def filter_by_name(self, queryset, name, value):
 
         if not value:
             return queryset
 
-        starts_with = Q(name__istartswith=value)
-        contains = Q(name__icontains=value)
-
-        result = queryset.filter(contains).annotate(
+        return queryset.filter(name__icontains=value).annotate(
             priority=Case(
-                When(starts_with, then=Value(0)),
-                When(contains, then=Value(1)),
-                default=Value(2),
+                When(name__istartswith=value, then=Value(0)),
+                default=Value(1),
                 output_field=IntegerField()
             )
-        ).order_by('priority', 'name')
+        ).order_by('priority', *self.name_ordering)
 
-        return result
 
+class IngredientFilter(NameSearchMixin, filters.FilterSet):
+    """
+    Фильтрует ингредиенты для рецепта по вхождению в начало и в середину слова.
+    """
+    name = filters.CharFilter(method='filter_by_name')
 
-class RecipeFilter(filters.FilterSet):
+    class Meta:
+        model = Ingredient
+        fields = ('name', )
+
+
+class RecipeFilter(NameSearchMixin, filters.FilterSet):
     """
-    Фильтрует рецепты по полям 'tags', 'is_favorited', 'is_in_shopping_cart'.
+    Фильтрует рецепты по полям 'tags', 'is_favorited', 'is_in_shopping_cart'
+    и ищет по названию. Параметр ordering задаёт сортировку из
+    RECIPE_ORDERINGS; каждую обслуживает составной индекс Recipe.
+    Фильтры применяются в порядке Meta.fields, поэтому ordering
+    применяется последним и заменяет порядок поиска по названию.
     """
+    name_ordering = ('-id', )
+
+    name = filters.CharFilter(method='filter_by_name')
     tags = filters.ModelMultipleChoiceFilter(
         queryset=Tag.objects.all(),
         field_name='tags__slug',
         to_field_name='slug',
+        method='filter_tags',
         label='Tags',
     )
     is_favorited = filters.BooleanFilter(
@@ -52,10 +78,40 @@ class RecipeFilter(filters.FilterSet):
         method='filter_shopping_cart',
         label='Is_In_Shopping_Cart'
     )
+    ordering = filters.ChoiceFilter(
+        choices=[(key, key) for key in RECIPE_ORDERINGS],
+        method='order_recipes',
+        label='Ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'tags', 'is_in_shopping_cart', 'author')
+        fields = (
+            'is_favorited',
+            'tags',
+            'is_in_shopping_cart',
+            'author',
+            'name',
+            'ordering'
+        )
+
+    def order_recipes(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Рецепты хотя бы с одним из тегов. Условие EXISTS вместо JOIN не
+        размножает строки рецепта по числу совпавших тегов, поэтому не
+        нужен DISTINCT, а стоимость не растёт с числом выбранных тегов.
+        """
+        if not value:
+            return queryset
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag__in=value
+            )
+        ))
 
     def filter_favorited(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
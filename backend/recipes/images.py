@@ -0,0 +1,95 @@
+"""Уменьшенные версии изображений рецептов."""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.cache import bump_cache_version
+from core.tasks import task
+from foodgram.constants import (
+    IMAGE_RENDITION_FORMAT,
+    IMAGE_RENDITION_QUALITY,
+    IMAGE_RENDITIONS
+)
+
+from .models import Recipe
+
+
+def needs_renditions(recipe):
+    return bool(recipe.image) and (
+        recipe.image_renditions.get('source') != recipe.image.name
+    )
+
+
+def schedule_renditions(recipe):
+    """Ставит создание версий изображения в фоновую очередь."""
+    create_renditions.delay(
+        recipe_id=recipe.id,
+        image_name=recipe.image.name
+    )
+
+
+def delete_renditions(renditions):
+    """Удаляет файлы версий изображения."""
+    storage = Recipe.image.field.storage
+    for key in IMAGE_RENDITIONS:
+        if renditions.get(key):
+            storage.delete(renditions[key])
+
+
+@task
+def create_renditions(recipe_id, image_name):
+    """
+    Создаёт версии изображения для каждого размера из IMAGE_RENDITIONS
+    и сохраняет их пути в Recipe.image_renditions, если изображение
+    рецепта за это время не сменилось.
+    """
+    storage = Recipe.image.field.storage
+    with storage.open(image_name) as f:
+        image = ImageOps.exif_transpose(Image.open(f))
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    base = os.path.splitext(image_name)[0]
+    extension = IMAGE_RENDITION_FORMAT.lower()
+    renditions = {'source': image_name}
+    for key, size in IMAGE_RENDITIONS.items():
+        rendition = image.copy()
+        rendition.thumbnail((size, size))
+        buffer = BytesIO()
+        rendition.save(
+            buffer,
+            IMAGE_RENDITION_FORMAT,
+            quality=IMAGE_RENDITION_QUALITY
+        )
+        renditions[key] = storage.save(
+            f'{base}_{key}.{extension}',
+            ContentFile(buffer.getvalue())
+        )
+    previous = Recipe.objects.filter(
+        pk=recipe_id
+    ).values_list('image_renditions', flat=True).first() or {}
+    updated = Recipe.objects.filter(
+        pk=recipe_id,
+        image=image_name
+    ).update(
+        image_renditions=renditions,
+        updated_at=timezone.now()
+    )
+    delete_renditions(previous if updated else renditions)
+    if updated:
+        bump_cache_version('recipes')
+
+
+def get_rendition_urls(recipe, request=None):
+    """Возвращает адреса готовых версий изображения рецепта."""
+    renditions = recipe.image_renditions or {}
+    if not recipe.image or renditions.get('source') != recipe.image.name:
+        return {}
+    storage = Recipe.image.field.storage
+    urls = {}
+    for key in IMAGE_RENDITIONS:
+        if renditions.get(key):
+            url = storage.url(renditions[key])
+            urls[key] = request.build_absolute_uri(url) if request else url
+    return urls
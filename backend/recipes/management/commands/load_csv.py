@@ -1,24 +1,119 @@
 import csv
+import json
 import os
+import time
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from core.cache import bump_cache_version
+from core.conditional import bump_collection_version
+from recipes.catalogue import rebuild_catalogue_snapshot
 from recipes.models import Ingredient
 
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PATH = os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv')
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        for line, row in enumerate(csv.reader(f), start=1):
+            if len(row) != 2:
+                raise CommandError(f'{path}:{line}: expected 2 columns')
+            yield row
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        for item in json.load(f):
+            yield item['name'], item['measurement_unit']
+
+
+def read_json_lines(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield item['name'], item['measurement_unit']
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+    '.jsonl': read_json_lines,
+}
+
 
 class Command(BaseCommand):
-    help = 'Load data from CSV files into the database'
+    help = (
+        'Load ingredients from CSV, JSON or JSON Lines files into the '
+        'database. Existing ingredients are skipped, so the command can be '
+        'run repeatedly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            default=[DEFAULT_PATH],
+            help='Files to load (default: data/ingredients.csv).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of rows inserted per query.'
+        )
 
     def handle(self, *args, **options):
-        csv_path = os.path.join(os.getcwd(), 'data', 'ingredients.csv')
-        with open(csv_path, encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                name, measurement_unit = row
-                Ingredient.objects.get_or_create(
-                    name=name.strip(),
-                    measurement_unit=measurement_unit.strip()
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        for path in options['paths']:
+            reader = READERS.get(os.path.splitext(path)[1].lower())
+            if reader is None:
+                raise CommandError(
+                    f'{path}: unsupported format, '
+                    f'expected one of {", ".join(READERS)}'
                 )
-            self.stdout.write(
-                self.style.SUCCESS('Ingredients loaded successfully')
+            self._load(path, reader, batch_size)
+        self.stdout.write(
+            self.style.SUCCESS('Ingredients loaded successfully')
+        )
+
+    def _load(self, path, reader, batch_size):
+        started = time.perf_counter()
+        rows = (
+            Ingredient(
+                name=name.strip(),
+                measurement_unit=measurement_unit.strip()
             )
+            for name, measurement_unit in reader(path)
+        )
+        total = 0
+        with transaction.atomic():
+            count_before = Ingredient.objects.count()
+            while batch := list(islice(rows, batch_size)):
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                total += len(batch)
+                self._report(path, total, started)
+            created = Ingredient.objects.count() - count_before
+            if created:
+                bump_collection_version('ingredients')
+                rebuild_catalogue_snapshot.delay()
+                transaction.on_commit(
+                    lambda: bump_cache_version('ingredients', 'recipes')
+                )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{path}: {total} rows read, {created} created, '
+            f'{total - created} skipped in {elapsed:.2f} s'
+        )
+
+    def _report(self, path, total, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{path}: {total} rows ({total / elapsed:.0f} rows/s)'
+        )
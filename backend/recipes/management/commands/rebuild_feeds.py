@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recipes.feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the following feeds from the current subscriptions: switch '
+        'authors with many followers to fan-out on read and add the latest '
+        'recipes of the others to their followers\' feeds.'
+    )
+
+    def handle(self, *args, **options):
+        created = rebuild_feeds()
+        self.stdout.write(f'Добавлено записей в ленты: {created}')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import ShoppingCart, ShoppingListItem
+from recipes.shopping_list import (
+    get_shopping_list_totals,
+    refresh_shopping_lists
+)
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare stored shopping lists with the shopping carts and rebuild '
+        'the lists that have drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report inconsistent shopping lists.'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = set(
+            ShoppingCart.objects.values_list('user_id', flat=True)
+        ) | set(
+            ShoppingListItem.objects.values_list('user_id', flat=True)
+        )
+        expected = set(get_shopping_list_totals(user_ids).iterator())
+        stored = set(
+            ShoppingListItem.objects.values_list(
+                'user_id',
+                'ingredient_id',
+                'amount'
+            ).iterator()
+        )
+        broken = sorted({user_id for user_id, _, _ in expected ^ stored})
+        self.stdout.write(
+            f'Проверено списков: {len(user_ids)}, '
+            f'расхождений: {len(broken)}'
+        )
+        if options['dry_run'] or not broken:
+            return
+        for start in range(0, len(broken), BATCH_SIZE):
+            refresh_shopping_lists(broken[start:start + BATCH_SIZE])
+        self.stdout.write(
+            self.style.SUCCESS('Списки покупок пересобраны')
+        )
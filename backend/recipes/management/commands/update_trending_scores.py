@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recipes.trending import update_trending_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalculate the time-decayed favorite score used by '
+        '?ordering=trending. The worker also runs it periodically.'
+    )
+
+    def handle(self, *args, **options):
+        updated = update_trending_scores()
+        self.stdout.write(f'Обновлено рецептов: {updated}')
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+TAG_INDEX = 'recipe_tags_tag_recipe_idx'
+
+
+def create_tag_index(apps, schema_editor):
+    """
+    Индекс (tag_id, recipe_id) для автоматически созданной таблицы связи
+    рецептов с тегами: по тегу находит рецепты, не обращаясь к таблице.
+    """
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TAG_INDEX} '
+        f'ON recipes_recipe_tags (tag_id, recipe_id)'
+    )
+
+
+def drop_tag_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TAG_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0011_recipe_orderings'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tag_index, drop_tag_index),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-id'], name='recipe_author_idx'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_user', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='ingredientrecipe',
+            name='recipe',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ingredientrecipe_set', to='recipes.recipe'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='recipes', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_user', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='shoppinglistitem',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:52
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=16, unique=True, verbose_name='Версия')),
+                ('tags_version', models.PositiveBigIntegerField(verbose_name='Версия тегов')),
+                ('ingredients_version', models.PositiveBigIntegerField(verbose_name='Версия ингредиентов')),
+                ('content', models.BinaryField(verbose_name='JSON')),
+                ('gzip_content', models.BinaryField(verbose_name='JSON, gzip')),
+                ('brotli_content', models.BinaryField(null=True, verbose_name='JSON, brotli')),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Построен')),
+            ],
+            options={
+                'verbose_name': 'снимок справочника',
+                'verbose_name_plural': 'Снимки справочника',
+                'ordering': ('-built_at',),
+                'indexes': [models.Index(fields=['tags_version', 'ingredients_version'], name='catalogue_versions_idx')],
+            },
+        ),
+    ]
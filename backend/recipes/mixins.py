@@ -1,4 +1,3 @@
-from django.db.models.query import prefetch_related_objects
 from rest_framework.response import Response
 
 
@@ -12,13 +11,6 @@ class PatchModelMixin:
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        queryset = self.filter_queryset(self.get_queryset())
-        if queryset._prefetch_related_lookups:
-            instance._prefetched_objects_cache = {}
-            prefetch_related_objects(
-                [instance],
-                *queryset._prefetch_related_lookups
-            )
         return Response(serializer.data)
 
     def perform_update(self, serializer):
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from foodgram.constants import (
+    CATALOGUE_VERSION_LENGTH,
     MAX_INGREDIENT_NAME,
     MAX_MEASUREMENT_UNIT,
     MAX_RECIPE_NAME,
@@ -76,6 +78,7 @@ class Recipe(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='recipes',
+        db_index=False,
         verbose_name='Автор'
     )
     ingredients = models.ManyToManyField(
@@ -93,6 +96,12 @@ class Recipe(models.Model):
         null=True,
         verbose_name='Изображение'
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Версии изображения'
+    )
     text = models.TextField(
         verbose_name='Описание'
     )
@@ -106,10 +115,51 @@ class Recipe(models.Model):
         ),
         verbose_name='Время приготовления'
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В корзинах'
+    )
+    trending_score = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Популярность за последнее время'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создан'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменён'
+    )
 
     class Meta:
         verbose_name = 'рецепт'
         verbose_name_plural = 'рецепты'
+        indexes = [
+            models.Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_popular_idx'
+            ),
+            models.Index(
+                fields=('-trending_score', '-id'),
+                name='recipe_trending_idx'
+            ),
+            models.Index(
+                fields=('cooking_time', '-id'),
+                name='recipe_cooking_time_idx'
+            ),
+            models.Index(
+                fields=('author', '-id'),
+                name='recipe_author_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -123,7 +173,8 @@ class IngredientRecipe(models.Model):
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
-        related_name='ingredientrecipe_set'
+        related_name='ingredientrecipe_set',
+        db_index=False
     )
     amount = models.PositiveIntegerField(
         validators=[
@@ -153,6 +204,7 @@ class FavoriteShoppingCart(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='%(class)s_user',
+        db_index=False,
         verbose_name='пользователь'
     )
     recipe = models.ForeignKey(
@@ -176,6 +228,11 @@ class FavoriteShoppingCart(models.Model):
 
 
 class Favorite(FavoriteShoppingCart):
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата добавления'
+    )
 
     class Meta(FavoriteShoppingCart.Meta):
         verbose_name = 'избранное'
@@ -187,3 +244,114 @@ class ShoppingCart(FavoriteShoppingCart):
     class Meta(FavoriteShoppingCart.Meta):
         verbose_name = 'корзина'
         verbose_name_plural = 'корзины'
+
+
+class ShoppingListItem(models.Model):
+    """
+    Позиция списка покупок пользователя: суммарное количество ингредиента
+    по всем рецептам в корзине. Поддерживается при изменении корзины и
+    состава рецептов.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        db_index=False,
+        verbose_name='пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='ингредиент'
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name='Количество'
+    )
+
+    class Meta:
+        verbose_name = 'позиция списка покупок'
+        verbose_name_plural = 'списки покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_list_item'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} : {self.ingredient} {self.amount}'
+
+
+class CatalogueSnapshot(models.Model):
+    """
+    Справочник тегов и ингредиентов в JSON, заранее сжатый gzip и brotli.
+    version - хэш содержимого, поэтому адрес снимка с этой версией
+    никогда не меняет содержимого. tags_version и ingredients_version -
+    версии коллекций, по которым снимок построен.
+    """
+    version = models.CharField(
+        max_length=CATALOGUE_VERSION_LENGTH,
+        unique=True,
+        verbose_name='Версия'
+    )
+    tags_version = models.PositiveBigIntegerField(
+        verbose_name='Версия тегов'
+    )
+    ingredients_version = models.PositiveBigIntegerField(
+        verbose_name='Версия ингредиентов'
+    )
+    content = models.BinaryField(verbose_name='JSON')
+    gzip_content = models.BinaryField(verbose_name='JSON, gzip')
+    brotli_content = models.BinaryField(
+        null=True,
+        verbose_name='JSON, brotli'
+    )
+    built_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Построен'
+    )
+
+    class Meta:
+        verbose_name = 'снимок справочника'
+        verbose_name_plural = 'Снимки справочника'
+        ordering = ('-built_at', )
+        indexes = [
+            models.Index(
+                fields=['tags_version', 'ingredients_version'],
+                name='catalogue_versions_idx'
+            )
+        ]
+
+    def __str__(self):
+        return self.version
+
+
+class FeedEntry(models.Model):
+    """Рецепт в ленте подписчика, записанный при публикации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        db_index=False,
+        verbose_name='пользователь'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='рецепт'
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи лент'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_feed_entry'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} : {self.recipe}'
@@ -1,16 +1,275 @@
+import json
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import (
-    LimitOffsetPagination,
+    CursorPagination,
+    LimitOffsetPagination as LOPagination,
     PageNumberPagination as PNPagination
 )
 
-from foodgram.constants import PAGE_SIZE_QUERY_PARAM, PAGE_QUERY_PARAM
+from rest_framework.utils.urls import replace_query_param
+
+from foodgram.constants import (
+    CURSOR_QUERY_PARAM,
+    PAGE_SIZE_QUERY_PARAM,
+    PAGE_QUERY_PARAM,
+    PAGINATION_APPROXIMATE_THRESHOLD,
+    PAGINATION_COUNT_TIMEOUT
+)
+
+Cursor = namedtuple('Cursor', ('reverse', 'position'))
+
+
+def get_queryset_count(queryset):
+    """
+    Считает объекты способом из settings.PAGINATION_COUNT:
+    'exact' - COUNT(*) на каждый запрос;
+    'cached' - COUNT(*), сохранённый в кэше на PAGINATION_COUNT_TIMEOUT;
+    'approximate' - оценка планировщика PostgreSQL, если она не меньше
+    PAGINATION_APPROXIMATE_THRESHOLD, иначе точный подсчёт.
+    """
+    if not hasattr(queryset, 'query'):
+        return len(queryset)
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    if settings.PAGINATION_COUNT == 'cached':
+        key = 'pagination-count:{}'.format(
+            md5(f'{sql}{params}'.encode()).hexdigest()
+        )
+        return cache.get_or_set(
+            key,
+            queryset.count,
+            PAGINATION_COUNT_TIMEOUT
+        )
+    connection = connections[queryset.db]
+    if (
+        settings.PAGINATION_COUNT == 'approximate'
+        and connection.vendor == 'postgresql'
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= PAGINATION_APPROXIMATE_THRESHOLD:
+            return estimate
+    return queryset.count()
+
+
+class CountPaginator(Paginator):
+    """Paginator, считающий объекты через get_queryset_count."""
+
+    @cached_property
+    def count(self):
+        return get_queryset_count(self.object_list)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация: не выполняет OFFSET и COUNT(*), курсоры остаются
+    корректными при добавлении новых объектов.
+    Порядок берётся из queryset (по умолчанию по убыванию id) и
+    дополняется id, чтобы ключ сортировки был уникальным. Курсор хранит
+    значения всех полей ключа у крайней строки страницы, поэтому следующая
+    страница выбирается условием по составному ключу и читается из
+    индекса с тем же порядком, даже если первое поле часто повторяется.
+    Поля сортировки не должны принимать значение NULL.
+    Пустой параметр cursor соответствует первой странице.
+    """
+    ordering = '-id'
+    cursor_query_param = CURSOR_QUERY_PARAM
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(queryset.query.order_by) or [self.ordering]
+        if not all(
+            isinstance(field, str) and '__' not in field and field != '?'
+            for field in ordering
+        ):
+            ordering = [self.ordering]
+        for index, field in enumerate(ordering):
+            if field.lstrip('-') in ('id', 'pk'):
+                return ordering[:index + 1]
+        return ordering + [self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(
+                    self.get_position_filter(self.cursor.position, reverse)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+        self.has_next = has_more or reverse
+        self.has_previous = has_more if reverse else self.cursor is not None
+        if self.page:
+            self.next_position = self.get_position(self.page[-1])
+            self.previous_position = self.get_position(self.page[0])
+        elif self.cursor is not None:
+            self.next_position = self.cursor.position
+            self.previous_position = self.cursor.position
+        else:
+            self.has_next = self.has_previous = False
+        return self.page
+
+    def get_position(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
 
+    def get_position_filter(self, position, reverse):
+        """
+        Строки после позиции в порядке сортировки:
+        (a > x) OR (a = x AND b > y) OR ... для каждого поля ключа.
+        """
+        condition = None
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            after = equal & Q(**{f'{name}__{lookup}': value})
+            condition = after if condition is None else condition | after
+            equal &= Q(**{name: value})
+        return condition
 
-class PageNumberPagination(PNPagination):
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(False, self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(True, self.previous_position))
+
+    def encode_cursor(self, cursor):
+        data = {'p': cursor.position}
+        if cursor.reverse:
+            data['r'] = 1
+        token = b64encode(json.dumps(
+            data,
+            cls=DjangoJSONEncoder,
+            separators=(',', ':')
+        ).encode()).decode('ascii')
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            token
+        )
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(b64decode(token.encode('ascii')))
+            position = data['p']
+            reverse = bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or any(isinstance(value, (list, dict)) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(reverse, position)
+
+
+class FeedPagination(KeysetPagination):
+    """
+    Курсорная пагинация ленты по убыванию id. Перед выборкой страницы
+    queryset ограничивается рецептами, которые view.get_feed_recipe_ids
+    возвращает для позиции курсора, поэтому читается только одна страница
+    ленты.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = queryset.order_by(self.ordering)
+        self.ordering = [self.ordering]
+        cursor = self.decode_cursor(request)
+        try:
+            recipe_ids = view.get_feed_recipe_ids(
+                self.get_page_size(request) + 1,
+                cursor.position[0] if cursor else None,
+                cursor is not None and cursor.reverse
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return super().paginate_queryset(
+            queryset.filter(pk__in=recipe_ids),
+            request,
+            view
+        )
+
+
+class KeysetOptInMixin:
+    """
+    Переключает пагинацию на курсорную, если в запросе передан
+    параметр cursor. Без него работает исходная пагинация.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+        if CURSOR_QUERY_PARAM in request.query_params:
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(
+                queryset,
+                request,
+                view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class PageNumberPagination(KeysetOptInMixin, PNPagination):
     page_query_param = PAGE_QUERY_PARAM
     page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    django_paginator_class = CountPaginator
+
+
+class LimitOffsetPagination(KeysetOptInMixin, LOPagination):
+
+    def get_count(self, queryset):
+        return get_queryset_count(queryset)
 
 
-class RecipesLimitPagination(LimitOffsetPagination):
+class RecipesLimitPagination(LOPagination):
     limit_query_param = 'recipes_limit'
     offset_query_param = None
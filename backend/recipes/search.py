@@ -0,0 +1,88 @@
+"""Поиск ингредиентов по названию без обращения к базе данных."""
+from bisect import bisect_left
+
+from core.loaders import TTLCachedLoader
+from foodgram.constants import INGREDIENT_INDEX_TTL, INGREDIENT_NGRAM_SIZE
+
+from .models import Ingredient
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса.
+
+    Ингредиенты хранятся отсортированными по названию. Поиск по началу
+    названия выполняется бинарным поиском по отсортированному массиву,
+    поиск по вхождению - пересечением списков n-грамм с последующей
+    проверкой кандидатов. Порядок результатов совпадает с
+    IngredientFilter: сначала совпадения по началу названия, затем по
+    вхождению, внутри групп - по алфавиту.
+
+    Индекс строится при первом обращении, сбрасывается сигналами при
+    изменении ингредиентов и перестраивается по истечении
+    INGREDIENT_INDEX_TTL, чтобы процессы, не получившие сигнал,
+    не отдавали устаревшие данные.
+    """
+
+    def __init__(
+        self,
+        ttl=INGREDIENT_INDEX_TTL,
+        ngram_size=INGREDIENT_NGRAM_SIZE
+    ):
+        self.ngram_size = ngram_size
+        self._data = TTLCachedLoader(self._build, ttl)
+
+    def invalidate(self):
+        self._data.invalidate()
+
+    def search(self, value):
+        """Возвращает список ингредиентов, название которых содержит value."""
+        entries, keys, postings = self._data.get()
+        value = value.lower()
+        start = bisect_left(keys, value)
+        end = bisect_left(keys, value + '\uffff', lo=start)
+        prefix = range(start, end)
+        contains = sorted(
+            position for position in self._candidates(value, keys, postings)
+            if not keys[position].startswith(value)
+        )
+        return [entries[position] for position in (*prefix, *contains)]
+
+    def _candidates(self, value, keys, postings):
+        if len(value) <= self.ngram_size:
+            return postings.get(value, ())
+        grams = sorted(
+            {
+                value[i:i + self.ngram_size]
+                for i in range(len(value) - self.ngram_size + 1)
+            },
+            key=lambda gram: len(postings.get(gram, ()))
+        )
+        candidates = set(postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(postings.get(gram, ()))
+        return (
+            position for position in candidates if value in keys[position]
+        )
+
+    def _build(self):
+        entries = sorted(
+            Ingredient.objects.only('id', 'name', 'measurement_unit'),
+            key=lambda ingredient: (ingredient.name.lower(), ingredient.id)
+        )
+        keys = [ingredient.name.lower() for ingredient in entries]
+        postings = {}
+        for position, key in enumerate(keys):
+            grams = {
+                key[i:i + size]
+                for size in range(1, self.ngram_size + 1)
+                for i in range(len(key) - size + 1)
+            }
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        return entries, keys, postings
+
+
+ingredient_index = IngredientIndex()
@@ -1,7 +1,12 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from foodgram.constants import MIN_INGREDIENT_AMOUNT
-from core.fields import Base64ImageField
+from core.fields import (
+    Base64ImageField,
+    BulkPrimaryKeyRelatedField,
+    LoadedPrimaryKeyRelatedField
+)
 from core.serializers import ShortRecipeSerializer
 from users.serializers import UserDetailSerializer
 from .models import (
@@ -12,6 +17,9 @@ from .models import (
     ShoppingCart,
     Tag
 )
+from .feed import schedule_fan_out
+from .images import get_rendition_urls
+from .shopping_list import apply_recipe_changes_to_shopping_lists
 
 
 class TagReadSerializer(serializers.ModelSerializer):
@@ -64,7 +72,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         many=True,
         required=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
         many=True,
         required=True
@@ -82,34 +90,138 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         )
 
     def to_representation(self, instance):
-        return RecipeDisplaySerializer(instance, context=self.context).data
+        """
+        Ответ собирается из тегов и ингредиентов, записанных в create
+        и update, без повторного чтения рецепта.
+        """
+        return SavedRecipeSerializer(instance, context=self.context).data
 
     def _create_ingredients_in_recipe(self, recipe, ingredients):
-        IngredientRecipe.objects.bulk_create((
+        return IngredientRecipe.objects.bulk_create([
             IngredientRecipe(
                 recipe=recipe,
-                ingredient_id=ingredient['id'],
+                ingredient=ingredient['ingredient'],
                 amount=ingredient['amount']
             )
             for ingredient in ingredients
-        ))
+        ])
 
+    @transaction.atomic
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         ingredients = validated_data.pop('ingredients', [])
         tags = validated_data.pop('tags', [])
         recipe = Recipe.objects.create(**validated_data)
-        recipe.tags.set(tags)
-        self._create_ingredients_in_recipe(recipe, ingredients)
+        recipe.tags.add(*tags)
+        recipe.saved_tags = tags
+        recipe.saved_ingredients = self._create_ingredients_in_recipe(
+            recipe,
+            ingredients
+        )
+        recipe.is_favorited = recipe.is_in_shopping_cart = False
+        schedule_fan_out(recipe)
         return recipe
 
+    def _update_ingredients_in_recipe(self, recipe, ingredients):
+        """
+        Приводит ингредиенты рецепта к переданным, изменяя только
+        отличающиеся строки. Возвращает строки рецепта в порядке запроса
+        и прежние количества ингредиентов или None, если состав не изменился.
+        """
+        current = {
+            item.ingredient_id: item
+            for item in recipe.ingredientrecipe_set.all()
+        }
+        old_amounts = {
+            ingredient_id: item.amount
+            for ingredient_id, item in current.items()
+        }
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed = current.keys() - amounts.keys()
+        added = amounts.keys() - current.keys()
+        changed = []
+        for ingredient_id, item in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+        if removed:
+            IngredientRecipe.objects.filter(
+                pk__in=[current[ingredient_id].pk for ingredient_id in removed]
+            ).delete()
+        rows = {
+            row.ingredient_id: row
+            for row in self._create_ingredients_in_recipe(
+                recipe,
+                (
+                    ingredient for ingredient in ingredients
+                    if ingredient['id'] in added
+                )
+            )
+        } if added else {}
+        if changed:
+            IngredientRecipe.objects.bulk_update(changed, ('amount', ))
+        for ingredient in ingredients:
+            row = rows.setdefault(
+                ingredient['id'],
+                current.get(ingredient['id'])
+            )
+            row.ingredient = ingredient['ingredient']
+        return (
+            [rows[ingredient['id']] for ingredient in ingredients],
+            old_amounts if removed or added or changed else None
+        )
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients = validated_data.pop('ingredients', [])
-        tags = validated_data.pop('tags', [])
-        instance.tags.set(tags)
-        instance.ingredients.clear()
-        self._create_ingredients_in_recipe(instance, ingredients)
-        return super().update(instance, validated_data)
+        """
+        Записывает только изменившиеся поля, ингредиенты и теги.
+        Если ingredients или tags нет в данных, связи не затрагиваются.
+        При любом изменении обновляется updated_at рецепта, от которого
+        зависит ETag ответов с ним.
+        """
+        related_changed = False
+        if 'tags' in validated_data:
+            tags = validated_data.pop('tags')
+            current = set(instance.tags.values_list('pk', flat=True))
+            new = {tag.pk for tag in tags}
+            if current - new:
+                instance.tags.remove(*(current - new))
+            if new - current:
+                instance.tags.add(*(new - current))
+            related_changed = current != new
+            instance.saved_tags = tags
+        else:
+            instance.saved_tags = instance.tags.all()
+        if 'ingredients' in validated_data:
+            rows, old_amounts = self._update_ingredients_in_recipe(
+                instance,
+                validated_data.pop('ingredients')
+            )
+            instance.saved_ingredients = rows
+            if old_amounts is not None:
+                related_changed = True
+                apply_recipe_changes_to_shopping_lists(
+                    instance.id,
+                    old_amounts,
+                    {row.ingredient_id: row.amount for row in rows}
+                )
+        else:
+            instance.saved_ingredients = (
+                instance.ingredientrecipe_set.select_related('ingredient')
+            )
+        update_fields = [
+            field for field, value in validated_data.items()
+            if getattr(instance, field) != value
+        ]
+        for field in update_fields:
+            setattr(instance, field, validated_data[field])
+        if update_fields or related_changed:
+            instance.save(update_fields=[*update_fields, 'updated_at'])
+        return instance
 
     def validate_ingredients(self, value):
         if not value:
@@ -122,12 +234,6 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 'Ингредиенты не должны повторяться'
             )
         for ingredient in value:
-            if not Ingredient.objects.filter(
-                id=ingredient['id']
-            ).exists():
-                raise serializers.ValidationError(
-                    'Нельзя добавить несуществующий ингредиент'
-                )
             try:
                 amount = int(ingredient['amount'])
             except (ValueError, TypeError):
@@ -139,6 +245,18 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                     f'Нельзя добавить ингредиент в количестве меньше '
                     f'{MIN_INGREDIENT_AMOUNT}'
                 )
+        existing = Ingredient.objects.in_bulk(ingredient_ids)
+        missing_ids = [
+            str(ingredient_id) for ingredient_id in ingredient_ids
+            if ingredient_id not in existing
+        ]
+        if missing_ids:
+            raise serializers.ValidationError(
+                f'Нельзя добавить несуществующие ингредиенты: '
+                f'{", ".join(missing_ids)}'
+            )
+        for ingredient in value:
+            ingredient['ingredient'] = existing[ingredient['id']]
         return value
 
     def validate_tags(self, value):
@@ -165,7 +283,8 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 class RecipeDisplaySerializer(serializers.ModelSerializer):
     """
     Сериализатор для отображения рецептов (полная версия).
-    Вычисляет поля is_favorited и is_in_shopping_cart.
+    Вычисляет поля is_favorited и is_in_shopping_cart, в image_renditions
+    отдаёт адреса уменьшенных версий изображения.
     """
 
     author = UserDetailSerializer(read_only=True)
@@ -180,6 +299,7 @@ class RecipeDisplaySerializer(serializers.ModelSerializer):
         required=True,
         allow_null=False
     )
+    image_renditions = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -194,11 +314,17 @@ class RecipeDisplaySerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_renditions',
             'text',
             'cooking_time'
         )
 
+    def get_image_renditions(self, obj):
+        return get_rendition_urls(obj, self.context.get('request'))
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         return (
             request
@@ -207,6 +333,8 @@ class RecipeDisplaySerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         return (
             request
@@ -215,14 +343,37 @@ class RecipeDisplaySerializer(serializers.ModelSerializer):
         )
 
 
+class SavedRecipeSerializer(RecipeDisplaySerializer):
+    """
+    Рецепт сразу после создания или изменения: теги и ингредиенты
+    берутся из атрибутов saved_tags и saved_ingredients.
+    """
+
+    ingredients = IngredientsRecipeSerializer(
+        many=True,
+        source='saved_ingredients'
+    )
+    tags = TagReadSerializer(
+        many=True,
+        source='saved_tags'
+    )
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
-    """Сериализатор избранного."""
+    """
+    Сериализатор избранного.
+    Принимает уже загруженные рецепт и пользователя; повторное добавление
+    проверяется одним запросом в validate.
+    """
+    serializer_related_field = LoadedPrimaryKeyRelatedField
+
     class Meta:
         model = Favorite
         fields = (
             'user',
             'recipe'
         )
+        validators = ()
 
     def validate(self, data):
         if Favorite.objects.filter(
@@ -242,13 +393,16 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
-    """Сериализатор корзины."""
+    """Сериализатор корзины, устроен так же, как FavoriteSerializer."""
+    serializer_related_field = LoadedPrimaryKeyRelatedField
+
     class Meta:
         model = ShoppingCart
         fields = (
             'user',
             'recipe'
         )
+        validators = ()
 
     def validate(self, data):
         if ShoppingCart.objects.filter(
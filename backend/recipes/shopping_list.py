@@ -0,0 +1,247 @@
+"""Список покупок: поддержка агрегированной таблицы и выгрузка файла."""
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    Q,
+    Sum,
+    Value,
+    When
+)
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from foodgram.constants import SHOPPING_LIST_BATCH_SIZE
+from .models import IngredientRecipe, ShoppingCart, ShoppingListItem
+
+User = get_user_model()
+
+SHOPPING_LIST_TITLE = 'Список покупок:'
+CSV_HEADER = ('Ингредиент', 'Количество', 'Единица измерения')
+
+
+def get_shopping_list_totals(user_ids, ingredient_ids=None):
+    """
+    Вычисляет по корзинам суммарное количество ингредиентов:
+    кортежи (пользователь, ингредиент, количество).
+    """
+    totals = IngredientRecipe.objects.filter(
+        recipe__shoppingcart_recipe__user__in=user_ids
+    )
+    if ingredient_ids is not None:
+        totals = totals.filter(ingredient__in=ingredient_ids)
+    return totals.values_list(
+        'recipe__shoppingcart_recipe__user',
+        'ingredient'
+    ).annotate(total=Sum('amount')).order_by()
+
+
+def refresh_shopping_lists(user_ids, ingredient_ids=None):
+    """
+    Пересчитывает списки покупок пользователей user_ids.
+    Если передан ingredient_ids, пересчитываются только эти позиции.
+    Строки пользователей блокируются, чтобы параллельные изменения
+    корзины не перезаписывали результаты друг друга.
+    """
+    with transaction.atomic():
+        user_ids = list(
+            User.objects.select_for_update().filter(
+                id__in=user_ids
+            ).order_by('id').values_list('id', flat=True)
+        )
+        if not user_ids:
+            return
+        items = ShoppingListItem.objects.filter(user__in=user_ids)
+        if ingredient_ids is not None:
+            items = items.filter(ingredient__in=ingredient_ids)
+        items.delete()
+        ShoppingListItem.objects.bulk_create(
+            ShoppingListItem(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=total
+            )
+            for user_id, ingredient_id, total in get_shopping_list_totals(
+                user_ids,
+                ingredient_ids
+            )
+        )
+
+
+def get_recipe_amounts(recipe_id):
+    """Возвращает {ингредиент: количество} для рецепта."""
+    return dict(
+        IngredientRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id').annotate(
+            total=Sum('amount')
+        ).order_by()
+    )
+
+
+def apply_shopping_list_deltas(users, deltas):
+    """
+    Прибавляет к позициям списков покупок пользователей users изменения
+    количества deltas ({ингредиент: изменение}). Недостающие позиции
+    создаются, позиции с нулевым остатком удаляются. users - список id
+    или запрос, возвращающий id пользователей; их строки блокируются,
+    чтобы параллельные изменения не удалили позицию, к которой
+    прибавляется количество.
+    """
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta
+    }
+    if not deltas:
+        return
+    with transaction.atomic():
+        user_ids = list(
+            User.objects.select_for_update().filter(
+                id__in=users
+            ).order_by('id').values_list('id', flat=True)
+        )
+        if not user_ids:
+            return
+        items = ShoppingListItem.objects.filter(
+            user__in=user_ids,
+            ingredient__in=deltas
+        )
+        decreased = Q()
+        for ingredient_id, delta in deltas.items():
+            if delta < 0:
+                decreased |= Q(ingredient=ingredient_id, amount__lte=-delta)
+        if decreased:
+            items.filter(decreased).delete()
+        increased = [
+            ingredient_id
+            for ingredient_id, delta in deltas.items() if delta > 0
+        ]
+        if increased:
+            ShoppingListItem.objects.bulk_create(
+                (
+                    ShoppingListItem(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        amount=0
+                    )
+                    for user_id in user_ids
+                    for ingredient_id in increased
+                ),
+                batch_size=SHOPPING_LIST_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+        items.update(
+            amount=F('amount') + Case(
+                *(
+                    When(ingredient=ingredient_id, then=Value(delta))
+                    for ingredient_id, delta in deltas.items()
+                ),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+
+
+def add_recipe_to_shopping_lists(users, amounts, sign=1):
+    """
+    Добавляет количества amounts ({ингредиент: количество}) рецепта в
+    списки покупок users, при sign=-1 - вычитает их.
+    """
+    apply_shopping_list_deltas(
+        users,
+        {
+            ingredient_id: sign * amount
+            for ingredient_id, amount in amounts.items()
+        }
+    )
+
+
+def apply_recipe_changes_to_shopping_lists(recipe_id, old_amounts,
+                                           new_amounts):
+    """
+    Переносит изменение состава рецепта в списки покупок всех, у кого
+    он в корзине: к позициям прибавляется разница количеств.
+    """
+    apply_shopping_list_deltas(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values('user_id'),
+        {
+            ingredient_id: (
+                new_amounts.get(ingredient_id, 0)
+                - old_amounts.get(ingredient_id, 0)
+            )
+            for ingredient_id in old_amounts.keys() | new_amounts.keys()
+        }
+    )
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Не выбирает рендерер по параметру format:
+    в выгрузке он задаёт формат файла.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class _Echo:
+    """Буфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _txt(shopping_list):
+    yield f'{SHOPPING_LIST_TITLE}\n\n'
+    for ingredient in shopping_list:
+        yield (
+            f'- {ingredient["ingredient__name"]}: '
+            f'{ingredient["total_amount"]} '
+            f'{ingredient["ingredient__measurement_unit"]}\n'
+        )
+
+
+def _csv(shopping_list):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for ingredient in shopping_list:
+        yield writer.writerow((
+            ingredient['ingredient__name'],
+            ingredient['total_amount'],
+            ingredient['ingredient__measurement_unit']
+        ))
+
+
+def _json(shopping_list):
+    separator = '['
+    for ingredient in shopping_list:
+        yield separator + json.dumps(
+            {
+                'name': ingredient['ingredient__name'],
+                'amount': ingredient['total_amount'],
+                'measurement_unit': ingredient['ingredient__measurement_unit']
+            },
+            ensure_ascii=False
+        )
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+# Формат: (content type, генератор содержимого).
+EXPORT_FORMATS = {
+    'txt': ('text/plain; charset=utf-8', _txt),
+    'csv': ('text/csv; charset=utf-8', _csv),
+    'json': ('application/json', _json),
+}
+
+
+def export_shopping_list(shopping_list, export_format):
+    """Возвращает content type и генератор частей файла."""
+    content_type, generator = EXPORT_FORMATS[export_format]
+    return content_type, (
+        chunk.encode('utf-8') for chunk in generator(shopping_list)
+    )
@@ -0,0 +1,177 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+
+from core.cache import bump_cache_version
+from core.conditional import bump_collection_version
+from core.counters import increment_counter
+from users.models import Subscriptions
+from .catalogue import rebuild_catalogue_snapshot
+from .feed import add_author_to_feed, remove_author_from_feed
+from .models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from .images import (
+    delete_renditions,
+    needs_renditions,
+    schedule_renditions
+)
+from .search import ingredient_index
+from .shopping_list import add_recipe_to_shopping_lists, get_recipe_amounts
+
+User = get_user_model()
+
+AUTHOR_FIELDS = ('email', 'username', 'first_name', 'last_name', 'avatar')
+RECIPE_COUNTERS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+
+def invalidate_api_cache(*groups):
+    """Сбрасывает кэш ответов после фиксации транзакции."""
+    transaction.on_commit(lambda: bump_cache_version(*groups))
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_caches(sender, **kwargs):
+    """Сбрасывает индекс поиска и кэш ответов при изменении ингредиентов."""
+    ingredient_index.invalidate()
+    bump_collection_version('ingredients')
+    rebuild_catalogue_snapshot.delay()
+    invalidate_api_cache('ingredients', 'recipes')
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags_cache(sender, **kwargs):
+    bump_collection_version('tags')
+    rebuild_catalogue_snapshot.delay()
+    invalidate_api_cache('tags', 'recipes')
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipes_cache(sender, **kwargs):
+    invalidate_api_cache('recipes')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cache(sender, instance, created, update_fields=None,
+                            **kwargs):
+    """
+    Данные автора входят в ответы с рецептами, поэтому версия авторов
+    меняется только при изменении полей AUTHOR_FIELDS. У нового
+    пользователя ещё нет рецептов.
+    """
+    fields = set(AUTHOR_FIELDS)
+    if update_fields is not None:
+        fields &= set(update_fields)
+    changed = not created and instance.get_changed_fields(fields)
+    instance.remember_field_values()
+    if changed:
+        bump_collection_version('authors')
+        invalidate_api_cache('recipes')
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_recipe_to_shopping_list(sender, instance, created, **kwargs):
+    """Прибавляет ингредиенты рецепта к списку покупок."""
+    if created:
+        add_recipe_to_shopping_lists(
+            [instance.user_id],
+            get_recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remember_shopping_cart_ingredients(sender, instance, **kwargs):
+    """
+    Запоминает ингредиенты рецепта до удаления: при каскадном удалении
+    рецепта они могут быть удалены раньше позиции корзины.
+    """
+    instance.ingredient_amounts = get_recipe_amounts(instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def remove_recipe_from_shopping_list(sender, instance, **kwargs):
+    """Вычитает ингредиенты рецепта из списка покупок."""
+    add_recipe_to_shopping_lists(
+        [instance.user_id],
+        getattr(instance, 'ingredient_amounts', {}),
+        sign=-1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def create_image_renditions(sender, instance, **kwargs):
+    """
+    Создаёт уменьшенные версии нового изображения рецепта и удаляет
+    версии прежнего.
+    """
+    renditions = instance.image_renditions or {}
+    if renditions and renditions.get('source') != instance.image.name:
+        transaction.on_commit(lambda: delete_renditions(renditions))
+    if needs_renditions(instance):
+        schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_image_renditions(sender, instance, **kwargs):
+    renditions = instance.image_renditions or {}
+    if renditions:
+        transaction.on_commit(lambda: delete_renditions(renditions))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def increment_recipe_counter(sender, instance, created, **kwargs):
+    if created:
+        increment_counter(Recipe, instance.recipe_id, RECIPE_COUNTERS[sender])
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def decrement_recipe_counter(sender, instance, **kwargs):
+    increment_counter(
+        Recipe,
+        instance.recipe_id,
+        RECIPE_COUNTERS[sender],
+        -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        increment_counter(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    increment_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Subscriptions)
+def add_author_recipes_to_feed(sender, instance, created, **kwargs):
+    if created and not instance.author.fan_out_on_read:
+        add_author_to_feed.delay(
+            user_id=instance.user_id,
+            author_id=instance.author_id
+        )
+
+
+@receiver(post_delete, sender=Subscriptions)
+def remove_author_recipes_from_feed(sender, instance, **kwargs):
+    remove_author_from_feed(instance.user_id, instance.author_id)
@@ -0,0 +1,90 @@
+"""Общие данные для тестов API рецептов."""
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='password',
+        first_name='Имя',
+        last_name='Фамилия'
+    )
+
+
+def create_recipe(author, amounts, tags=(), **fields):
+    """Создаёт рецепт с ингредиентами amounts ({ингредиент: количество})."""
+    fields.setdefault('name', 'Рецепт')
+    fields.setdefault('text', 'Описание')
+    fields.setdefault('cooking_time', 10)
+    recipe = Recipe.objects.create(
+        author=author,
+        image='dish_picture/test.png',
+        **fields
+    )
+    recipe.tags.set(tags)
+    IngredientRecipe.objects.bulk_create(
+        IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=amount)
+        for ingredient, amount in amounts.items()
+    )
+    return recipe
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeAPITestCase(APITestCase):
+    """
+    Автор с двумя рецептами, читатель, теги и ингредиенты. Кэш очищается
+    перед каждым тестом: ответы не должны переходить из теста в тест.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.reader = create_user('reader')
+        cls.breakfast = Tag.objects.create(name='Завтрак', slug='breakfast')
+        cls.dinner = Tag.objects.create(name='Ужин', slug='dinner')
+        cls.salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        cls.sugar = Ingredient.objects.create(
+            name='сахар',
+            measurement_unit='г'
+        )
+        cls.milk = Ingredient.objects.create(
+            name='молоко',
+            measurement_unit='мл'
+        )
+        cls.porridge = create_recipe(
+            cls.author,
+            {cls.salt: 2, cls.milk: 300},
+            [cls.breakfast],
+            name='Каша'
+        )
+        cls.pancakes = create_recipe(
+            cls.author,
+            {cls.sugar: 50, cls.milk: 200},
+            [cls.breakfast, cls.dinner],
+            name='Блины'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from core.cache import get_cache_stats
+from .base import RecipeAPITestCase
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ResponseCacheTests(RecipeAPITestCase):
+    """Закэшированные ответы сбрасываются при изменении данных."""
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_repeated_read_is_served_from_cache(self):
+        url = reverse('recipe-list')
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(url)['X-Cache'], 'HIT')
+
+    def test_hits_and_misses_are_counted(self):
+        url = reverse('recipe-list')
+        self.get(url)
+        self.get(url)
+        self.get(url)
+        self.assertEqual(get_cache_stats(), {'hits': 2, 'misses': 1})
+        out = StringIO()
+        call_command('api_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits: 2, misses: 1, hit ratio: 66.7%', out.getvalue())
+        self.assertEqual(get_cache_stats(), {'hits': 0, 'misses': 0})
+
+    def test_authenticated_recipe_list_is_not_cached(self):
+        self.client.force_authenticate(self.reader)
+        url = reverse('recipe-list')
+        self.get(url)
+        self.assertFalse(self.get(url).has_header('X-Cache'))
+        self.assertEqual(get_cache_stats(), {'hits': 0, 'misses': 0})
+
+    def test_recipe_update_invalidates_lists(self):
+        url = reverse('recipe-list')
+        self.get(url)
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('recipe-detail', args=(self.porridge.id, )),
+                {
+                    'tags': [self.breakfast.id],
+                    'ingredients': [{'id': self.salt.id, 'amount': 1}],
+                    'name': 'Овсянка',
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(None)
+        response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn(
+            'Овсянка',
+            [recipe['name'] for recipe in response.data['results']]
+        )
+
+    def test_tag_change_invalidates_tags_and_recipes(self):
+        tags_url = reverse('tag-list')
+        recipe_url = reverse('recipe-detail', args=(self.porridge.id, ))
+        self.get(tags_url)
+        self.get(recipe_url)
+        self.breakfast.name = 'Утро'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.breakfast.save()
+        response = self.get(tags_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Утро', [tag['name'] for tag in response.data])
+        response = self.get(recipe_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['tags'][0]['name'], 'Утро')
+
+    def test_author_rename_invalidates_recipes(self):
+        url = reverse('recipe-detail', args=(self.porridge.id, ))
+        self.get(url)
+        self.author.first_name = 'Анна'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['author']['first_name'], 'Анна')
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        url = reverse('recipe-list')
+        self.get(url)
+        self.assertFalse(self.get(url).has_header('X-Cache'))
+        self.assertEqual(get_cache_stats(), {'hits': 0, 'misses': 0})
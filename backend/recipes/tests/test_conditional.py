@@ -0,0 +1,131 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.conditional import bump_collection_version
+from recipes.models import Favorite
+from .base import RecipeAPITestCase
+
+
+class ConditionalGetTests(RecipeAPITestCase):
+    """ETag меняется после записи, которая меняет ответ, и только тогда."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+        self.list_url = reverse('recipe-list')
+        self.detail_url = reverse('recipe-detail', args=(self.porridge.id, ))
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified(self):
+        for url in (self.list_url, self.detail_url, reverse('tag-list')):
+            with self.subTest(url=url):
+                self.assertNotModified(url, self.get_etag(url))
+
+    def test_favorite_changes_etag(self):
+        etags = {url: self.get_etag(url) for url in (
+            self.list_url,
+            self.detail_url
+        )}
+        Favorite.objects.create(user=self.reader, recipe=self.porridge)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertModified(url, etag)
+
+    def test_recipe_update_changes_etag(self):
+        etags = {url: self.get_etag(url) for url in (
+            self.list_url,
+            self.detail_url
+        )}
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            self.detail_url,
+            {
+                'tags': [self.dinner.id],
+                'ingredients': [{'id': self.salt.id, 'amount': 2}],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(self.reader)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertModified(url, etag)
+
+    def test_tag_rename_changes_etag(self):
+        etags = {url: self.get_etag(url) for url in (
+            self.list_url,
+            self.detail_url,
+            reverse('tag-list')
+        )}
+        self.breakfast.name = 'Утро'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.breakfast.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertModified(url, etag)
+
+    def test_version_bumped_by_other_process_changes_etag(self):
+        url = reverse('tag-list')
+        etag = self.get_etag(url)
+        bump_collection_version('tags')
+        self.assertModified(url, etag)
+
+    def test_author_rename_changes_etag(self):
+        etag = self.get_etag(self.detail_url)
+        self.author.last_name = 'Петрова'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        self.assertModified(self.detail_url, etag)
+
+    def test_private_author_changes_keep_etag(self):
+        etag = self.get_etag(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.set_password('new-password')
+            self.author.save()
+            self.author.followers_count = 10
+            self.author.save(update_fields=['followers_count'])
+        self.assertNotModified(self.detail_url, etag)
+
+    def test_last_modified_for_anonymous_recipe(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.detail_url)
+        last_modified = response['Last-Modified']
+        response = self.client.get(
+            self.detail_url,
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_mismatch_returns_full_response(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                self.client.get(url)
+                with CaptureQueriesContext(connection) as plain_queries:
+                    plain = self.client.get(url)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        url,
+                        HTTP_IF_NONE_MATCH='"outdated"'
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, plain.content)
+                self.assertEqual(response['ETag'], plain['ETag'])
+                self.assertLessEqual(
+                    len(queries),
+                    len(plain_queries) + 1
+                )
@@ -0,0 +1,133 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import FeedEntry
+from users.models import Subscriptions
+from .base import IMAGE, RecipeAPITestCase, create_recipe, create_user
+
+
+@override_settings(TASK_QUEUE_EAGER=True)
+class FeedTests(RecipeAPITestCase):
+    """
+    Лента подписок заполняется при подписке и публикации рецепта и
+    очищается при отписке. Задачи выполняются сразу после фиксации.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+
+    def get_feed(self, **params):
+        response = self.client.get(reverse('recipe-feed'), params)
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def subscribe(self, author):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('user-subscribe', args=(author.id, ))
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def publish(self, author, name='Суп'):
+        self.client.force_authenticate(author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('recipe-list'),
+                {
+                    'tags': [self.dinner.id],
+                    'ingredients': [{'id': self.salt.id, 'amount': 1}],
+                    'name': name,
+                    'image': IMAGE,
+                    'text': 'Описание',
+                    'cooking_time': 30,
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.client.force_authenticate(self.reader)
+        return response.data['id']
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('recipe-feed'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_subscribe_backfills_feed(self):
+        self.assertEqual(self.get_feed(), [])
+        self.subscribe(self.author)
+        self.assertEqual(
+            self.get_feed(),
+            [self.pancakes.id, self.porridge.id]
+        )
+
+    def test_unsubscribe_removes_author(self):
+        other = create_user('other')
+        other_recipe = create_recipe(other, {self.salt: 1})
+        self.subscribe(self.author)
+        self.subscribe(other)
+        response = self.client.delete(
+            reverse('user-subscribe', args=(self.author.id, ))
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_feed(), [other_recipe.id])
+
+    def test_new_recipe_is_fanned_out(self):
+        self.subscribe(self.author)
+        recipe_id = self.publish(self.author)
+        self.assertEqual(self.get_feed()[0], recipe_id)
+        self.assertTrue(
+            FeedEntry.objects.filter(
+                user=self.reader,
+                recipe_id=recipe_id
+            ).exists()
+        )
+
+    def test_popular_author_is_read_on_request(self):
+        self.subscribe(self.author)
+        with mock.patch('recipes.feed.FEED_FANOUT_THRESHOLD', 0):
+            recipe_id = self.publish(self.author)
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.fan_out_on_read)
+        self.assertFalse(
+            FeedEntry.objects.filter(recipe_id=recipe_id).exists()
+        )
+        self.assertEqual(self.get_feed()[0], recipe_id)
+        new_follower = create_user('follower')
+        self.client.force_authenticate(new_follower)
+        self.subscribe(self.author)
+        self.assertFalse(FeedEntry.objects.filter(user=new_follower).exists())
+        self.assertEqual(
+            self.get_feed(),
+            [recipe_id, self.pancakes.id, self.porridge.id]
+        )
+
+    def test_paging(self):
+        other = create_user('other')
+        for index in range(3):
+            create_recipe(other, {self.salt: 1}, name=f'Рецепт {index}')
+        self.subscribe(self.author)
+        self.subscribe(other)
+        expected = self.get_feed(limit=10)
+        self.assertEqual(len(expected), 5)
+        ids = []
+        response = self.client.get(reverse('recipe-feed'), {'limit': 2})
+        while True:
+            ids.extend(recipe['id'] for recipe in response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, expected)
+
+    def test_rebuild_feeds(self):
+        Subscriptions.objects.create(user=self.reader, author=self.author)
+        FeedEntry.objects.all().delete()
+        call_command('rebuild_feeds', stdout=StringIO())
+        self.assertEqual(
+            self.get_feed(),
+            [self.pancakes.id, self.porridge.id]
+        )
@@ -0,0 +1,68 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from .base import IMAGE, RecipeAPITestCase
+
+storage = Recipe.image.field.storage
+
+
+@override_settings(TASK_QUEUE_EAGER=True)
+class ImageRenditionTests(RecipeAPITestCase):
+    """Версии изображения удаляются вместе с рецептом и при смене фото."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('recipe-list'),
+                {
+                    'tags': [self.dinner.id],
+                    'ingredients': [{'id': self.salt.id, 'amount': 1}],
+                    'name': 'Суп',
+                    'image': IMAGE,
+                    'text': 'Описание',
+                    'cooking_time': 30,
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.recipe = Recipe.objects.get(id=response.data['id'])
+
+    def get_rendition_files(self):
+        renditions = dict(self.recipe.image_renditions)
+        renditions.pop('source')
+        self.assertTrue(renditions)
+        for name in renditions.values():
+            self.assertTrue(storage.exists(name))
+        return renditions.values()
+
+    def test_renditions_deleted_with_recipe(self):
+        files = self.get_rendition_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        for name in files:
+            self.assertFalse(storage.exists(name))
+
+    def test_renditions_replaced_with_image(self):
+        files = self.get_rendition_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('recipe-detail', args=(self.recipe.id, )),
+                {
+                    'tags': [self.dinner.id],
+                    'ingredients': [{'id': self.salt.id, 'amount': 1}],
+                    'image': IMAGE,
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        for name in files:
+            self.assertFalse(storage.exists(name))
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            self.recipe.image_renditions['source'],
+            self.recipe.image.name
+        )
+        self.get_rendition_files()
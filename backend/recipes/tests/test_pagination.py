@@ -0,0 +1,131 @@
+from django.urls import reverse
+
+from recipes.filters import RECIPE_ORDERINGS
+from recipes.models import Recipe
+from .base import RecipeAPITestCase, create_recipe, create_user
+
+
+class CursorPaginationTests(RecipeAPITestCase):
+    """
+    Обход курсорами вперёд и назад возвращает каждый рецепт ровно один
+    раз в порядке сортировки, в том числе при повторяющихся значениях
+    первого поля ключа.
+    """
+    page_size = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(10):
+            recipe = create_recipe(
+                cls.author,
+                {cls.salt: 1},
+                [cls.dinner],
+                name=f'Рецепт {index}',
+                cooking_time=index % 3 + 1
+            )
+            Recipe.objects.filter(pk=recipe.pk).update(
+                favorites_count=index % 4,
+                trending_score=index % 2 * 1.5
+            )
+
+    def walk(self, url, params, link='next'):
+        """Проходит по ссылкам link и возвращает id и ссылки страниц."""
+        ids = []
+        response = self.client.get(url, params)
+        pages = 0
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            pages += 1
+            self.assertLess(pages, 20)
+            if response.data[link] is None:
+                return ids, response
+            response = self.client.get(response.data[link])
+
+    def test_walk_each_ordering(self):
+        url = reverse('recipe-list')
+        for ordering, fields in RECIPE_ORDERINGS.items():
+            with self.subTest(ordering=ordering):
+                expected = list(
+                    Recipe.objects.order_by(*fields).values_list(
+                        'id',
+                        flat=True
+                    )
+                )
+                ids, last_page = self.walk(
+                    url,
+                    {
+                        'ordering': ordering,
+                        'cursor': '',
+                        'limit': self.page_size,
+                    }
+                )
+                self.assertEqual(ids, expected)
+                back_ids = [
+                    item['id'] for item in last_page.data['results']
+                ]
+                response = last_page
+                while response.data['previous'] is not None:
+                    response = self.client.get(response.data['previous'])
+                    back_ids = [
+                        item['id'] for item in response.data['results']
+                    ] + back_ids
+                self.assertEqual(back_ids, expected)
+
+    def test_walk_with_filter(self):
+        ids, _ = self.walk(
+            reverse('recipe-list'),
+            {
+                'tags': self.breakfast.slug,
+                'cursor': '',
+                'limit': 1,
+            }
+        )
+        self.assertEqual(ids, [self.pancakes.id, self.porridge.id])
+
+    def test_new_recipe_does_not_shift_pages(self):
+        url = reverse('recipe-list')
+        response = self.client.get(
+            url,
+            {'cursor': '', 'limit': self.page_size}
+        )
+        first_page = [item['id'] for item in response.data['results']]
+        create_recipe(self.author, {self.salt: 1}, [self.dinner])
+        response = self.client.get(response.data['next'])
+        expected = list(
+            Recipe.objects.filter(pk__lt=first_page[-1]).order_by(
+                '-id'
+            ).values_list('id', flat=True)[:self.page_size]
+        )
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            expected
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse('recipe-list'),
+            {'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(
+            reverse('recipe-list'),
+            {'limit': self.page_size, 'page': 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], Recipe.objects.count())
+        self.assertEqual(len(response.data['results']), self.page_size)
+
+    def test_users_walk(self):
+        for index in range(4):
+            create_user(f'user{index}')
+        self.client.force_authenticate(self.reader)
+        ids, _ = self.walk(
+            reverse('user-list'),
+            {'cursor': '', 'limit': 2}
+        )
+        self.assertEqual(sorted(ids, reverse=True), ids)
+        self.assertEqual(len(ids), 6)
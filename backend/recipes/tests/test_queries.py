@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import Subscriptions
+from .base import RecipeAPITestCase, create_recipe, create_user
+
+
+class QueryCountTests(RecipeAPITestCase):
+    """
+    Число запросов на чтение не должно зависеть от числа объектов
+    на странице, как и в бюджетах команды benchmark_api. Первый запрос
+    прогревает кэши процесса и не учитывается.
+    """
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def add_recipes(self):
+        for index in range(5):
+            author = create_user(f'cook{index}')
+            Subscriptions.objects.create(user=self.reader, author=author)
+            create_recipe(
+                author,
+                {self.salt: index + 1, self.sugar: 10, self.milk: 100},
+                [self.breakfast, self.dinner],
+                name=f'Рецепт {index}'
+            )
+
+    def assert_constant_queries(self, url):
+        self.count_queries(url)
+        before = self.count_queries(url)
+        self.add_recipes()
+        self.assertEqual(self.count_queries(url), before)
+
+    def test_recipe_list_anonymous(self):
+        self.assert_constant_queries(reverse('recipe-list'))
+
+    def test_recipe_list_authenticated(self):
+        self.client.force_authenticate(self.reader)
+        self.assert_constant_queries(reverse('recipe-list'))
+
+    def test_recipe_list_cursor(self):
+        self.client.force_authenticate(self.reader)
+        self.assert_constant_queries(reverse('recipe-list') + '?cursor=')
+
+    def test_subscriptions(self):
+        Subscriptions.objects.create(user=self.reader, author=self.author)
+        self.client.force_authenticate(self.reader)
+        self.assert_constant_queries(reverse('user-subscriptions'))
+
+    def test_users_list(self):
+        self.client.force_authenticate(self.reader)
+        self.assert_constant_queries(reverse('user-list'))
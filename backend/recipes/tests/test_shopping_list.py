@@ -0,0 +1,183 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from recipes.models import ShoppingCart, ShoppingListItem
+from .base import IMAGE, RecipeAPITestCase, create_user
+
+
+class ShoppingListTests(RecipeAPITestCase):
+    """Список покупок меняется вместе с корзиной и составом рецептов."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+
+    def get_shopping_list(self, user=None):
+        return dict(
+            ShoppingListItem.objects.filter(
+                user=user or self.reader
+            ).values_list('ingredient_id', 'amount')
+        )
+
+    def add_to_cart(self, recipe):
+        response = self.client.post(
+            reverse('recipe-shopping-cart', args=(recipe.id, ))
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_add_to_cart(self):
+        self.add_to_cart(self.porridge)
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.salt.id: 2, self.milk.id: 300}
+        )
+        self.add_to_cart(self.pancakes)
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.salt.id: 2, self.sugar.id: 50, self.milk.id: 500}
+        )
+
+    def test_remove_from_cart(self):
+        self.add_to_cart(self.porridge)
+        self.add_to_cart(self.pancakes)
+        response = self.client.delete(
+            reverse('recipe-shopping-cart', args=(self.porridge.id, ))
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.sugar.id: 50, self.milk.id: 200}
+        )
+
+    def test_recipe_update(self):
+        self.add_to_cart(self.porridge)
+        self.add_to_cart(self.pancakes)
+        other = create_user('other')
+        ShoppingCart.objects.create(user=other, recipe=self.porridge)
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            reverse('recipe-detail', args=(self.porridge.id, )),
+            {
+                'tags': [self.breakfast.id],
+                'ingredients': [
+                    {'id': self.milk.id, 'amount': 250},
+                    {'id': self.sugar.id, 'amount': 20},
+                ],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.sugar.id: 70, self.milk.id: 450}
+        )
+        self.assertEqual(
+            self.get_shopping_list(other),
+            {self.sugar.id: 20, self.milk.id: 250}
+        )
+
+    def test_recipe_delete(self):
+        self.add_to_cart(self.porridge)
+        self.add_to_cart(self.pancakes)
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(
+            reverse('recipe-detail', args=(self.pancakes.id, ))
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.salt.id: 2, self.milk.id: 300}
+        )
+
+    def test_new_recipe_in_cart(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.post(
+            reverse('recipe-list'),
+            {
+                'tags': [self.dinner.id],
+                'ingredients': [{'id': self.salt.id, 'amount': 7}],
+                'name': 'Суп',
+                'image': IMAGE,
+                'text': 'Описание',
+                'cooking_time': 30,
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.force_authenticate(self.reader)
+        self.add_to_cart(self.porridge)
+        ShoppingCart.objects.create(
+            user=self.reader,
+            recipe_id=response.data['id']
+        )
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.salt.id: 9, self.milk.id: 300}
+        )
+
+    def test_download(self):
+        self.add_to_cart(self.porridge)
+        self.add_to_cart(self.pancakes)
+        response = self.client.get(
+            reverse('recipe-download-shopping-cart'),
+            {'format': 'csv'}
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('молоко,500,мл', content.replace('\r', ''))
+
+    def test_download_etag_changes_after_ingredient_rename(self):
+        self.add_to_cart(self.porridge)
+        url = reverse('recipe-download-shopping-cart')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.milk.name = 'молоко топлёное'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'молоко топлёное',
+            b''.join(response.streaming_content).decode()
+        )
+
+    def test_download_etag_changes_when_amounts_cancel_out(self):
+        self.add_to_cart(self.porridge)
+        url = reverse('recipe-download-shopping-cart')
+        etag = self.client.get(url)['ETag']
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            reverse('recipe-detail', args=(self.porridge.id, )),
+            {
+                'tags': [self.breakfast.id],
+                'ingredients': [
+                    {'id': self.salt.id, 'amount': 3},
+                    {'id': self.milk.id, 'amount': 299},
+                ],
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(self.reader)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.add_to_cart(self.porridge)
+        ShoppingListItem.objects.filter(
+            user=self.reader,
+            ingredient=self.milk
+        ).update(amount=1)
+        ShoppingListItem.objects.filter(
+            user=self.reader,
+            ingredient=self.salt
+        ).delete()
+        call_command('rebuild_shopping_lists', stdout=StringIO())
+        self.assertEqual(
+            self.get_shopping_list(),
+            {self.salt.id: 2, self.milk.id: 300}
+        )
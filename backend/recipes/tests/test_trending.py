@@ -0,0 +1,48 @@
+from unittest import mock
+
+from recipes.models import Favorite, Recipe
+from recipes.trending import update_trending_scores
+from .base import RecipeAPITestCase, create_user
+
+
+class TrendingScoreTests(RecipeAPITestCase):
+    """Пересчёт записывает только изменившиеся оценки."""
+
+    def get_scores(self):
+        return dict(Recipe.objects.values_list('id', 'trending_score'))
+
+    def test_scores_follow_favorites(self):
+        Favorite.objects.create(user=self.reader, recipe=self.porridge)
+        self.assertEqual(update_trending_scores(), 1)
+        scores = self.get_scores()
+        self.assertGreater(scores[self.porridge.id], 0)
+        self.assertEqual(scores[self.pancakes.id], 0)
+        Favorite.objects.create(user=self.author, recipe=self.pancakes)
+        Favorite.objects.create(
+            user=create_user('other'),
+            recipe=self.pancakes
+        )
+        self.assertEqual(update_trending_scores(), 1)
+        scores = self.get_scores()
+        self.assertGreater(scores[self.pancakes.id], scores[self.porridge.id])
+
+    def test_unchanged_scores_are_not_written(self):
+        Favorite.objects.create(user=self.reader, recipe=self.porridge)
+        update_trending_scores()
+        with mock.patch('recipes.trending.bump_cache_version') as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(update_trending_scores(), 0)
+        bump.assert_not_called()
+
+    def test_removed_favorite_resets_score(self):
+        favorite = Favorite.objects.create(
+            user=self.reader,
+            recipe=self.porridge
+        )
+        update_trending_scores()
+        favorite.delete()
+        with mock.patch('recipes.trending.bump_cache_version') as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(update_trending_scores(), 1)
+        bump.assert_called_once_with('recipes')
+        self.assertEqual(self.get_scores()[self.porridge.id], 0)
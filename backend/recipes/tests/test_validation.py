@@ -0,0 +1,104 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.models import Recipe
+from .base import IMAGE, RecipeAPITestCase
+
+
+class RecipeValidationTests(RecipeAPITestCase):
+    """
+    Теги и ингредиенты проверяются одним запросом на список, а ошибка
+    перечисляет все несуществующие ключи.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.author)
+
+    def post(self, tags, ingredients):
+        return self.client.post(
+            reverse('recipe-list'),
+            {
+                'tags': tags,
+                'ingredients': ingredients,
+                'name': 'Суп',
+                'image': IMAGE,
+                'text': 'Описание',
+                'cooking_time': 30,
+            },
+            format='json'
+        )
+
+    def test_missing_tags(self):
+        response = self.post(
+            [self.breakfast.id, 998, 999, 998],
+            [{'id': self.salt.id, 'amount': 1}]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['tags'],
+            ['Объекты с ключами 998, 999 не существуют.']
+        )
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_missing_ingredients(self):
+        response = self.post(
+            [self.breakfast.id],
+            [
+                {'id': 997, 'amount': 1},
+                {'id': self.salt.id, 'amount': 1},
+                {'id': 996, 'amount': 2},
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['ingredients'],
+            ['Нельзя добавить несуществующие ингредиенты: 997, 996']
+        )
+
+    def test_duplicate_ingredients(self):
+        response = self.post(
+            [self.breakfast.id],
+            [
+                {'id': self.salt.id, 'amount': 1},
+                {'id': self.salt.id, 'amount': 2},
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['ingredients'],
+            ['Ингредиенты не должны повторяться']
+        )
+
+    def test_duplicate_tags(self):
+        response = self.post(
+            [self.breakfast.id, self.breakfast.id],
+            [{'id': self.salt.id, 'amount': 1}]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['tags'],
+            ['Теги не должны повторяться']
+        )
+
+    def test_validation_queries_do_not_grow(self):
+        def count_queries(tags, ingredients):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(tags, ingredients)
+            self.assertEqual(response.status_code, 400)
+            return len(queries)
+
+        self.assertEqual(
+            count_queries(
+                [self.breakfast.id, 999],
+                [{'id': self.salt.id, 'amount': 1}]
+            ),
+            count_queries(
+                [self.breakfast.id, self.dinner.id, 998, 999],
+                [
+                    {'id': ingredient.id, 'amount': 1}
+                    for ingredient in (self.salt, self.sugar, self.milk)
+                ]
+            )
+        )
@@ -0,0 +1,80 @@
+"""Популярность рецептов за последнее время для сортировки trending."""
+from collections import defaultdict
+from datetime import timedelta
+from math import isclose
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_cache_version
+from core.tasks import task
+from foodgram.constants import (
+    TRENDING_EPOCH,
+    TRENDING_HALF_LIFE,
+    TRENDING_UPDATE_BATCH_SIZE,
+    TRENDING_WINDOW_DAYS
+)
+
+from .models import Favorite, Recipe
+
+
+def get_score_epoch(now):
+    """
+    Начало текущего периода длиной TRENDING_WINDOW_DAYS дней. Вклады
+    отсчитываются от него, а не от текущего момента: затухание меняет
+    все оценки в одно и то же число раз и не влияет на порядок, поэтому
+    без новых добавлений в избранное оценки не меняются до начала
+    следующего периода.
+    """
+    period = timedelta(days=TRENDING_WINDOW_DAYS)
+    return TRENDING_EPOCH + (now - TRENDING_EPOCH) // period * period
+
+
+def get_trending_scores(now=None):
+    """
+    Каждое добавление в избранное за последние TRENDING_WINDOW_DAYS дней
+    даёт рецепту вклад, который уменьшается вдвое за TRENDING_HALF_LIFE
+    секунд.
+    """
+    now = now or timezone.now()
+    epoch = get_score_epoch(now)
+    scores = defaultdict(float)
+    favorites = Favorite.objects.filter(
+        created_at__gte=now - timedelta(days=TRENDING_WINDOW_DAYS)
+    ).order_by('pk').values_list('recipe_id', 'created_at')
+    for recipe_id, created_at in favorites.iterator():
+        age = (epoch - created_at).total_seconds()
+        scores[recipe_id] += 0.5 ** (age / TRENDING_HALF_LIFE)
+    return scores
+
+
+@task
+def update_trending_scores():
+    """
+    Пересчитывает Recipe.trending_score и записывает только изменившиеся
+    оценки. Рецепты, которые больше не добавляли в избранное, получают 0.
+    Возвращает число изменённых рецептов.
+    """
+    scores = get_trending_scores()
+    with transaction.atomic():
+        current = dict(
+            Recipe.objects.filter(trending_score__gt=0).values_list(
+                'id',
+                'trending_score'
+            )
+        )
+        stale = current.keys() - scores.keys()
+        changed = [
+            Recipe(pk=recipe_id, trending_score=score)
+            for recipe_id, score in scores.items()
+            if not isclose(current.get(recipe_id, 0), score)
+        ]
+        Recipe.objects.filter(pk__in=stale).update(trending_score=0)
+        Recipe.objects.bulk_update(
+            changed,
+            ('trending_score', ),
+            batch_size=TRENDING_UPDATE_BATCH_SIZE
+        )
+    if stale or changed:
+        transaction.on_commit(lambda: bump_cache_version('recipes'))
+    return len(stale) + len(changed)
@@ -1,22 +1,58 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import (
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    prefetch_related_objects
+)
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.views.decorators.http import require_safe
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.cache import CachedResponseMixin
+from core.conditional import (
+    ConditionalGetMixin,
+    get_collection_versions,
+    get_timestamp,
+    make_etag
+)
+from foodgram.constants import CATALOGUE_MAX_AGE, SHOPPING_LIST_CHUNK_SIZE
+from users.serializers import get_followed_author_ids
+from .catalogue import get_catalogue_content, get_catalogue_version
+from .feed import get_feed_recipe_ids, get_pull_author_ids
 from .filters import IngredientFilter, RecipeFilter
 from .mixins import PatchModelMixin
+from .pagination import FeedPagination
 from .models import (
     Favorite,
     Ingredient,
     IngredientRecipe,
     Recipe,
     ShoppingCart,
+    ShoppingListItem,
     Tag
 )
 from .permissions import AuthorOrReadOnlyPermission
+from .search import ingredient_index
+from .shopping_list import (
+    EXPORT_FORMATS,
+    ExportContentNegotiation,
+    export_shopping_list
+)
 from .serializers import (
     RecipeCreateSerializer,
     IngredientDisplaySerializer,
@@ -27,19 +63,26 @@ from .serializers import (
 )
 
 
+RECIPE_COLLECTIONS = ('tags', 'ingredients', 'authors')
+
+
 class TagIngredientBaseViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet
 ):
     """Базовый вьюсет для тегов и ингредиентов."""
     pagination_class = None
+    cache_authenticated = True
 
 
 class TagViewSet(TagIngredientBaseViewSet):
     """Вьюсет для тегов."""
     queryset = Tag.objects.all()
     serializer_class = TagReadSerializer
+    cache_group = 'tags'
 
 
 class IngredientViewSet(TagIngredientBaseViewSet):
@@ -48,9 +91,22 @@ class IngredientViewSet(TagIngredientBaseViewSet):
     serializer_class = IngredientDisplaySerializer
     filter_backends = (DjangoFilterBackend, )
     filterset_class = IngredientFilter
+    cache_group = 'ingredients'
+
+    def filter_queryset(self, queryset):
+        name = self.request.query_params.get('name')
+        if (
+            settings.INGREDIENT_SEARCH_IN_MEMORY
+            and self.action == 'list'
+            and name
+        ):
+            return ingredient_index.search(name)
+        return super().filter_queryset(queryset)
 
 
 class RecipeViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -63,7 +119,9 @@ class RecipeViewSet(
     Включает в себя несколько кастомных методов:
     -favorite: позволяет добавить/удалить рецепт из избранного.
     -shopping_cart: позволяет добавить/удалить рецепт из списка покупок.
-    -download_shopping_cart: позволяет скачать список покупок в формате txt.
+    -download_shopping_cart: позволяет скачать список покупок в формате
+    txt, csv или json (параметр format).
+    -feed: лента рецептов авторов, на которых подписан пользователь.
     Если ингредиенты в рецептах повторяются, количество этих продуктов
     суммируется.
     """
@@ -71,6 +129,103 @@ class RecipeViewSet(
     permission_classes = (AuthorOrReadOnlyPermission, )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    cache_group = 'recipes'
+
+    def get_queryset(self):
+        """Рецепты с автором, тегами, ингредиентами и флагами пользователя."""
+        queryset = super().get_queryset()
+        if self.action == 'partial_update':
+            queryset = queryset.select_related('author')
+        elif self.action in ('list', 'retrieve', 'feed'):
+            queryset = queryset.select_related('author').prefetch_related(
+                *self.get_related_lookups()
+            )
+        else:
+            return queryset
+        return self.annotate_user_flags(queryset)
+
+    def get_related_lookups(self):
+        return (
+            'tags',
+            Prefetch(
+                'ingredientrecipe_set',
+                queryset=IngredientRecipe.objects.select_related('ingredient')
+            )
+        )
+
+    def annotate_user_flags(self, queryset):
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            )
+        )
+
+    def get_conditional_objects(self):
+        """Рецепты ответа без авторов, тегов и ингредиентов."""
+        queryset = self.filter_queryset(
+            self.annotate_user_flags(super().get_queryset())
+        )
+        if self.action == 'retrieve':
+            self.conditional_objects = [
+                get_object_or_404(queryset, pk=self.kwargs['pk'])
+            ]
+            return self.conditional_objects
+        page = self.paginate_queryset(queryset)
+        return queryset if page is None else page
+
+    def prepare_conditional_objects(self, objects):
+        """Дополняет рецепты страницы авторами, тегами и ингредиентами."""
+        prefetch_related_objects(
+            objects,
+            'author',
+            *self.get_related_lookups()
+        )
+        return objects
+
+    def get_pagination_state(self):
+        """Данные пагинации, которые входят в ответ помимо рецептов."""
+        paginator = self.paginator
+        keyset_paginator = getattr(paginator, 'keyset_paginator', None)
+        if keyset_paginator is not None:
+            return keyset_paginator.has_next, keyset_paginator.has_previous
+        page = getattr(paginator, 'page', None)
+        if page is not None:
+            return page.paginator.count
+        return getattr(paginator, 'count', None)
+
+    def get_conditional_validators(self, objects=None):
+        if objects is None:
+            objects = self.get_conditional_objects()
+        versions = get_collection_versions(*RECIPE_COLLECTIONS)
+        followed = get_followed_author_ids(self.request)
+        etag = make_etag(
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+            sorted(versions.items()),
+            self.get_pagination_state() if self.action == 'list' else None,
+            [
+                (
+                    recipe.id,
+                    recipe.updated_at,
+                    getattr(recipe, 'is_favorited', False),
+                    getattr(recipe, 'is_in_shopping_cart', False),
+                    recipe.author_id in followed
+                )
+                for recipe in objects
+            ]
+        )
+        if self.action != 'retrieve' or self.request.user.is_authenticated:
+            return etag, None
+        return etag, get_timestamp(
+            objects[0].updated_at,
+            *(updated_at for _, updated_at in versions.values())
+        )
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -85,8 +240,8 @@ class RecipeViewSet(
         user = request.user
         serializer = serializer(
             data={
-                'recipe': recipe.id,
-                'user': user.id
+                'recipe': recipe,
+                'user': user
             },
             context={'request': request}
         )
@@ -148,35 +303,106 @@ class RecipeViewSet(
             text='Рецепт не был добавлен в корзину'
         )
 
-    def _create_shopping_list(self, shopping_list):
-        file_content = 'Список покупок:\n\n'
-        for ingredient in shopping_list:
-            file_content += (
-                f'- {ingredient["ingredient__name"]}: '
-                f'{ingredient["total_amount"]} '
-                f'{ingredient["ingredient__measurement_unit"]}\n'
-            )
-        return file_content
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination
+    )
+    def feed(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_feed_recipe_ids(self, limit, position=None, reverse=False):
+        return get_feed_recipe_ids(
+            self.request.user,
+            get_pull_author_ids(self.request),
+            limit,
+            position,
+            reverse
+        )
 
     @action(
         detail=False,
         methods=['get'],
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        content_negotiation_class=ExportContentNegotiation
     )
     def download_shopping_cart(self, request):
-        shopping_list = IngredientRecipe.objects.filter(
-            recipe__shoppingcart_recipe__user=request.user
-        ).values(
+        export_format = request.query_params.get('format', 'txt')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'format': f'Доступные форматы: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        shopping_list = ShoppingListItem.objects.filter(user=request.user)
+        ingredients_version, _ = get_collection_versions(
+            'ingredients'
+        )['ingredients']
+        fingerprint = md5(f'{export_format}:{ingredients_version}'.encode())
+        for ingredient_id, amount in shopping_list.values_list(
+            'ingredient_id',
+            'amount'
+        ).order_by('ingredient_id').iterator(
+            chunk_size=SHOPPING_LIST_CHUNK_SIZE
+        ):
+            fingerprint.update(f':{ingredient_id}={amount}'.encode())
+        etag = f'W/"{fingerprint.hexdigest()}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            return response
+        shopping_list = shopping_list.values(
             'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(
-            total_amount=Sum('amount')
+            'ingredient__measurement_unit',
+            total_amount=F('amount')
         ).order_by(
             'ingredient__name'
+        ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+        content_type, content = export_shopping_list(
+            shopping_list,
+            export_format
         )
-        file_content = self._create_shopping_list(shopping_list)
-        response = HttpResponse(file_content, content_type='text/plain')
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.txt"'
+            f'attachment; filename="shopping_list.{export_format}"'
         )
         return response
+
+
+@require_safe
+def catalogue(request):
+    """Переадресует на актуальный снимок справочника."""
+    response = redirect('catalogue_snapshot', version=get_catalogue_version())
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_safe
+def catalogue_snapshot(request, version):
+    """Отдаёт неизменяемый снимок справочника в подходящей кодировке."""
+    etag = f'"{version}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        snapshot = get_catalogue_content(
+            version,
+            request.headers.get('Accept-Encoding', '')
+        )
+        if snapshot is None:
+            return catalogue(request)
+        encoding, content = snapshot
+        response = HttpResponse(content, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding', ))
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=CATALOGUE_MAX_AGE,
+        immutable=True
+    )
+    return response
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    User.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                apps.get_model(app_label, related).objects.filter(
+                    author=OuterRef('pk')
+                ).order_by().values('author').annotate(
+                    total=Count('pk')
+                ).values('total')
+            ),
+            0
+        )
+        for field, app_label, related in (
+            ('recipes_count', 'recipes', 'Recipe'),
+            ('followers_count', 'users', 'Subscriptions'),
+        )
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_subscriptions_author_alter_subscriptions_user'),
+        ('recipes', '0010_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='подписчиков'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='рецептов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscriptions',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='following', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+    ]
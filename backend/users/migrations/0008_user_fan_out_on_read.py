@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_subscriptions_user_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='fan_out_on_read',
+            field=models.BooleanField(default=False, editable=False, verbose_name='рецепты в ленты при чтении'),
+        ),
+    ]
@@ -14,6 +14,21 @@ class User(AbstractUser):
     email = models.EmailField('email', unique=True)
     first_name = models.CharField('имя', max_length=MAX_NAME_LENGTH)
     last_name = models.CharField('фамилия', max_length=MAX_NAME_LENGTH)
+    recipes_count = models.PositiveIntegerField(
+        'рецептов',
+        default=0,
+        editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        'подписчиков',
+        default=0,
+        editable=False
+    )
+    fan_out_on_read = models.BooleanField(
+        'рецепты в ленты при чтении',
+        default=False,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'username']
@@ -22,6 +37,40 @@ class User(AbstractUser):
         verbose_name = 'пользователь'
         verbose_name_plural = 'Пользователи'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает загруженные значения полей, чтобы после сохранения
+        можно было узнать, какие из них изменились.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance.remember_field_values()
+        return instance
+
+    def get_field_values(self):
+        """Значения загруженных полей в том виде, в каком их пишут в базу."""
+        deferred = self.get_deferred_fields()
+        return {
+            field.name: field.get_prep_value(field.value_from_object(self))
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def remember_field_values(self):
+        self.loaded_values = self.get_field_values()
+
+    def get_changed_fields(self, field_names):
+        """
+        Поля из field_names, значения которых отличаются от загруженных.
+        У объекта, который не загружался из базы, изменены все поля.
+        """
+        loaded = getattr(self, 'loaded_values', {})
+        current = self.get_field_values()
+        return {
+            name for name in field_names
+            if name not in loaded or loaded[name] != current.get(name)
+        }
+
     def clean(self):
         super().clean()
         self.email = self.__class__.objects.normalize_email(self.email)
@@ -34,6 +83,7 @@ class Subscriptions(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='following',
+        db_index=False,
         verbose_name='пользователь'
     )
     author = models.ForeignKey(
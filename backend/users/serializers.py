@@ -4,7 +4,7 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
 from foodgram.constants import MAX_NAME_LENGTH
-from core.fields import Base64ImageField
+from core.fields import Base64ImageField, LoadedPrimaryKeyRelatedField
 from core.serializers import ShortRecipeSerializer
 from recipes.pagination import RecipesLimitPagination
 from .models import Subscriptions
@@ -12,6 +12,23 @@ from .models import Subscriptions
 User = get_user_model()
 
 
+def get_followed_author_ids(request):
+    """
+    Возвращает множество id авторов, на которых подписан пользователь
+    запроса. Загружается одним запросом и хранится до конца запроса,
+    поэтому все вложенные сериализаторы обходятся без отдельных запросов.
+    """
+    if request is None or not request.user.is_authenticated:
+        return frozenset()
+    if not hasattr(request, 'followed_author_ids'):
+        request.followed_author_ids = set(
+            Subscriptions.objects.filter(
+                user=request.user
+            ).values_list('author_id', flat=True)
+        )
+    return request.followed_author_ids
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """Сериализатор получения данных о пользователе."""
     is_subscribed = serializers.SerializerMethodField()
@@ -30,14 +47,9 @@ class UserDetailSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
-        return (
-            request
-            and request.user.is_authenticated
-            and Subscriptions.objects.filter(
-                user=request.user,
-                author=obj
-            ).exists()
-        )
+        if request is not None and request.user.id == obj.id:
+            return False
+        return obj.id in get_followed_author_ids(request)
 
 
 class UserCreateSerializer(DjoserUserCS):
@@ -89,13 +101,20 @@ class AvatarSerializer(serializers.ModelSerializer):
 
 
 class SubscribeSerializer(serializers.ModelSerializer):
-    """Сериализатор для создания подписки"""
+    """
+    Сериализатор для создания подписки.
+    Принимает уже загруженных пользователей; повторная подписка
+    проверяется одним запросом в validate.
+    """
+    serializer_related_field = LoadedPrimaryKeyRelatedField
+
     class Meta:
         model = Subscriptions
         fields = (
             'user',
             'author'
         )
+        validators = ()
 
     def validate(self, data):
         if data['user'] == data['author']:
@@ -119,7 +138,6 @@ class SubscribeSerializer(serializers.ModelSerializer):
 class SubscriptionsSerializer(UserDetailSerializer):
     """Сериализатор для работы с подписками."""
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -136,20 +154,18 @@ class SubscriptionsSerializer(UserDetailSerializer):
         )
 
     def get_recipes(self, obj):
-        """Получение рецептов пользователя."""
+        """
+        Получение рецептов пользователя.
+        Для списка подписок рецепты уже загружены одним запросом
+        с ограничением recipes_limit на каждого автора.
+        """
         request = self.context.get('request')
-        recipes = obj.recipes.all().order_by('-id')
-        paginator = RecipesLimitPagination()
-        paginated_recipes = paginator.paginate_queryset(
-            recipes,
-            request
-        )
+        recipes = getattr(obj, 'limited_recipes', None)
+        if recipes is None:
+            limit = RecipesLimitPagination().get_limit(request)
+            recipes = obj.recipes.order_by('-id')[:limit]
         return ShortRecipeSerializer(
-            paginated_recipes,
+            recipes,
             many=True,
             context={'request': request}
         ).data
-
-    def get_recipes_count(self, obj):
-        """Получение количества рецептов пользователя."""
-        return obj.recipes.count()
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.counters import increment_counter
+from .models import Subscriptions
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Subscriptions)
+def increment_followers_count(sender, instance, created, **kwargs):
+    if created:
+        increment_counter(User, instance.author_id, 'followers_count')
+
+
+@receiver(post_delete, sender=Subscriptions)
+def decrement_followers_count(sender, instance, **kwargs):
+    increment_counter(User, instance.author_id, 'followers_count', -1)
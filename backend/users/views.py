@@ -1,8 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from djoser.serializers import SetPasswordSerializer
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
@@ -10,7 +10,12 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
-from recipes.pagination import PageNumberPagination
+from recipes.models import Recipe
+from recipes.pagination import (
+    LimitOffsetPagination,
+    PageNumberPagination,
+    RecipesLimitPagination
+)
 from .models import Subscriptions
 from .serializers import (
     AvatarSerializer,
@@ -48,9 +53,23 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         if self.action == 'subscriptions':
+            limit = RecipesLimitPagination().get_limit(self.request)
             return User.objects.filter(
                 followers__user=self.request.user
-            ).prefetch_related('recipes')
+            ).prefetch_related(
+                Prefetch(
+                    'recipes',
+                    queryset=Recipe.objects.only(
+                        'id',
+                        'author_id',
+                        'name',
+                        'image',
+                        'image_renditions',
+                        'cooking_time'
+                    ).order_by('-id')[:limit],
+                    to_attr='limited_recipes'
+                )
+            ).order_by('id')
         return User.objects.all()
 
     @action(
@@ -104,8 +123,8 @@ class UserViewSet(viewsets.ModelViewSet):
         user = request.user
         serializer = SubscribeSerializer(
             data={
-                'author': author.id,
-                'user': user.id
+                'author': author,
+                'user': user
             },
             context={'request': request}
         )